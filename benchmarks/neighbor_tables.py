@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared neighbour tables against the old per-call lookup.
+
+Usage:
+    python benchmarks/neighbor_tables.py
+"""
+
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper.game import MinesweeperGame
+
+
+def benchmark_neighbors(width: int = 30, height: int = 16, rounds: int = 200):
+    """
+    Compare MinesweeperGame's table-backed neighbour lookups and flood fill
+    against the old per-call version, which built a new bounds-checked list
+    on every lookup.
+    """
+    def legacy_neighbors(row, col):
+        neighbors = []
+        for dr in [-1, 0, 1]:
+            for dc in [-1, 0, 1]:
+                if dr == 0 and dc == 0:
+                    continue
+                nr, nc = row + dr, col + dc
+                if 0 <= nr < height and 0 <= nc < width:
+                    neighbors.append((nr, nc))
+        return neighbors
+
+    game = MinesweeperGame(width, height, 0)  # No mines, so one click floods the board
+    coords = [(r, c) for r in range(height) for c in range(width)]
+
+    for name, lookup in [("legacy", legacy_neighbors), ("table", game._get_neighbors)]:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for r, c in coords:
+                lookup(r, c)
+        elapsed = time.perf_counter() - start
+        print(f"{name} lookup: {elapsed / (rounds * len(coords)) * 1e9:.0f} ns")
+
+    def legacy_flood(row, col):
+        stack = [(row, col)]
+        visited = set()
+        while stack:
+            r, c = stack.pop()
+            if (r, c) in visited:
+                continue
+            visited.add((r, c))
+            cell = game.grid[r][c]
+            if (r, c) == (row, col) or (not cell.is_revealed and not cell.is_flagged):
+                cell.is_revealed = True
+                if cell.adjacent_mines == 0:
+                    for nr, nc in legacy_neighbors(r, c):
+                        if (nr, nc) not in visited:
+                            stack.append((nr, nc))
+
+    for name, flood in [("legacy", legacy_flood), ("table", game._reveal_empty_area)]:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for cell in game.cells:
+                cell.is_revealed = False
+            game.cells[0].is_revealed = True
+            flood(0, 0)
+        elapsed = time.perf_counter() - start
+        print(f"{name} flood fill: {rounds * len(coords) / elapsed:,.0f} cells/s")
+
+
+if __name__ == "__main__":
+    benchmark_neighbors()
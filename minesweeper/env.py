@@ -0,0 +1,356 @@
+"""
+Batched Minesweeper environment for bots and reinforcement learning.
+
+Holds N boards of the same size in stacked flat byte arrays and applies one
+reveal action per board on each step(). Boards use the same seeded mine
+placement as MinesweeperGame, so any board can be replayed against the real
+game logic. Observations use the MinesweeperGame.get_view() cell codes.
+
+When numpy is installed, step() reveals every board at once, growing all
+cascades together by dilating the zero cells through the neighbour table.
+Without numpy it falls back to a per-board flood fill.
+"""
+
+import random
+import time
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .game import MinesweeperGame, GameState, Topology, VIEW_HIDDEN, get_neighbor_table
+
+
+class BatchedMinesweeperEnv:
+    """
+    N Minesweeper boards stepped together.
+
+    Actions are row-major cell indices, one per board. Revealing a safe cell
+    rewards the fraction of the board's safe cells it opened, clearing the
+    board adds win_reward and hitting a mine gives loss_reward. Revealing an
+    already revealed cell is a no-op worth 0. Finished boards are reset to a
+    fresh board with the next seed before step() returns.
+
+    `vectorized` selects the numpy step; by default it is used when numpy is
+    installed and there are at least VECTORIZE_MIN_ENVS boards.
+    """
+
+    VECTORIZE_MIN_ENVS = 512
+
+    def __init__(self, num_envs: int, width: int = 9, height: int = 9, mines: int = 10,
+                 seed: Optional[int] = None, win_reward: float = 1.0,
+                 loss_reward: float = -1.0, topology: Topology = Topology.SQUARE,
+                 vectorized: Optional[bool] = None):
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+        if not 0 < mines < width * height:
+            raise ValueError("mines must leave at least one safe cell")
+        if vectorized is None:
+            vectorized = numpy is not None and num_envs >= self.VECTORIZE_MIN_ENVS
+        elif vectorized and numpy is None:
+            raise ValueError("vectorized stepping needs numpy")
+
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.mine_count = mines
+        self.topology = topology
+        self.win_reward = win_reward
+        self.loss_reward = loss_reward
+        self.cells = width * height
+        self.safe_cells = self.cells - mines
+
+        self._neighbors = get_neighbor_table(width, height, topology).indices
+        self._hidden_board = bytes([VIEW_HIDDEN]) * self.cells
+        self._empty_board = bytes(self.cells)
+        self._view = bytearray(self._hidden_board * num_envs)
+        self._mines = bytearray(self.cells * num_envs)
+        self._adjacent = bytearray(self.cells * num_envs)
+        self._revealed = [0] * num_envs
+        self._placed = [False] * num_envs
+        self._rngs = [random.Random() for _ in range(num_envs)]
+        self.vectorized = vectorized
+        if vectorized:
+            self._init_arrays()
+
+        # Seeds are handed out consecutively from the base seed as boards reset
+        self._next_seed = random.randrange(2 ** 32) if seed is None else seed
+        self.seeds = [0] * num_envs
+        for i in range(num_envs):
+            self._reset_board(i)
+
+    def _init_arrays(self):
+        """Wrap the board buffers in numpy arrays and pad the neighbour table."""
+        shape = (self.num_envs, self.cells)
+        self._view_array = numpy.frombuffer(self._view, dtype=numpy.uint8).reshape(shape)
+        self._mines_array = numpy.frombuffer(self._mines, dtype=numpy.uint8).reshape(shape)
+        self._adjacent_array = numpy.frombuffer(self._adjacent,
+                                                dtype=numpy.uint8).reshape(shape)
+        # Missing neighbours point at an extra column that is always False
+        degree = max(len(n) for n in self._neighbors)
+        self._neighbor_array = numpy.full((self.cells, degree), self.cells, dtype=numpy.intp)
+        for cell, neighbors in enumerate(self._neighbors):
+            self._neighbor_array[cell, :len(neighbors)] = neighbors
+        self._revealed = numpy.zeros(self.num_envs, dtype=numpy.int64)
+
+    def observations(self) -> memoryview:
+        """
+        Live (N, height, width) view of every board's cell codes. It is updated
+        in place by step(); copy it (or wrap it with numpy.asarray) to keep it.
+        """
+        return memoryview(self._view).cast("B", (self.num_envs, self.height, self.width))
+
+    def reset(self) -> memoryview:
+        """Reset every board and return the observations."""
+        for i in range(self.num_envs):
+            self._reset_board(i)
+        return self.observations()
+
+    def _reset_board(self, i: int):
+        """Start a fresh board with the next seed."""
+        start = i * self.cells
+        end = start + self.cells
+        self._view[start:end] = self._hidden_board
+        self._mines[start:end] = self._empty_board
+        self._adjacent[start:end] = self._empty_board
+        self._revealed[i] = 0
+        self._placed[i] = False
+        self.seeds[i] = self._next_seed
+        self._rngs[i].seed(self._next_seed)
+        self._next_seed += 1
+
+    def _place_mines(self, i: int, first_click: int):
+        """
+        Place mines exactly as MinesweeperGame._place_mines does. Its
+        randint(0, n - 1) calls are drawn here the way randint draws them,
+        with getrandbits and rejection, without the per-call overhead.
+        """
+        getrandbits = self._rngs[i].getrandbits
+        base = i * self.cells
+        mines = self._mines
+        adjacent = self._adjacent
+        neighbors = self._neighbors
+        width, height = self.width, self.height
+        width_bits, height_bits = width.bit_length(), height.bit_length()
+
+        placed = 0
+        while placed < self.mine_count:
+            row = getrandbits(height_bits)
+            while row >= height:
+                row = getrandbits(height_bits)
+            col = getrandbits(width_bits)
+            while col >= width:
+                col = getrandbits(width_bits)
+            cell = row * width + col
+            if cell == first_click or mines[base + cell]:
+                continue
+            mines[base + cell] = 1
+            placed += 1
+            for n in neighbors[cell]:
+                adjacent[base + n] += 1
+        self._placed[i] = True
+
+    def step(self, actions: Sequence[int]) -> Tuple[memoryview, List[float], List[bool]]:
+        """
+        Reveal one cell on every board.
+        Returns (observations, rewards, dones); boards that finished this step
+        have already been reset in the returned observations.
+        """
+        if len(actions) != self.num_envs:
+            raise ValueError(f"expected {self.num_envs} actions, got {len(actions)}")
+        if self.vectorized:
+            return self._step_vectorized(actions)
+
+        view = self._view
+        mines = self._mines
+        adjacent = self._adjacent
+        neighbors = self._neighbors
+        cells = self.cells
+        rewards = [0.0] * self.num_envs
+        dones = [False] * self.num_envs
+
+        for i, cell in enumerate(actions):
+            if not 0 <= cell < cells:
+                raise ValueError(f"action {cell} out of range for board {i}")
+            base = i * cells
+            if view[base + cell] != VIEW_HIDDEN:
+                continue
+            if not self._placed[i]:
+                self._place_mines(i, cell)
+
+            if mines[base + cell]:
+                rewards[i] = self.loss_reward
+                dones[i] = True
+                self._reset_board(i)
+                continue
+
+            # Flood fill from the clicked cell
+            opened = 0
+            stack = [cell]
+            view[base + cell] = adjacent[base + cell]
+            opened += 1
+            while stack:
+                c = stack.pop()
+                if view[base + c]:
+                    continue
+                for n in neighbors[c]:
+                    if view[base + n] == VIEW_HIDDEN:
+                        view[base + n] = adjacent[base + n]
+                        opened += 1
+                        stack.append(n)
+
+            self._revealed[i] += opened
+            rewards[i] = opened / self.safe_cells
+            if self._revealed[i] == self.safe_cells:
+                rewards[i] += self.win_reward
+                dones[i] = True
+                self._reset_board(i)
+
+        return self.observations(), rewards, dones
+
+    def _step_vectorized(self, actions: Sequence[int]
+                         ) -> Tuple[memoryview, List[float], List[bool]]:
+        """step() for all boards at once with numpy."""
+        actions = numpy.asarray(actions, dtype=numpy.intp)
+        bad = numpy.flatnonzero((actions < 0) | (actions >= self.cells))
+        if bad.size:
+            i = int(bad[0])
+            raise ValueError(f"action {int(actions[i])} out of range for board {i}")
+
+        view = self._view_array
+        rewards = numpy.zeros(self.num_envs)
+        done = numpy.zeros(self.num_envs, dtype=bool)
+
+        boards = numpy.flatnonzero(view[numpy.arange(self.num_envs), actions] == VIEW_HIDDEN)
+        for i in boards.tolist():
+            if not self._placed[i]:
+                self._place_mines(i, int(actions[i]))
+
+        cells = actions[boards]
+        hit = self._mines_array[boards, cells].astype(bool)
+        rewards[boards[hit]] = self.loss_reward
+        done[boards[hit]] = True
+        boards, cells = boards[~hit], cells[~hit]
+
+        if boards.size:
+            opened = self._cascade(boards, cells)
+            view[boards] = numpy.where(opened, self._adjacent_array[boards], view[boards])
+            counts = opened.sum(axis=1)
+            self._revealed[boards] += counts
+            rewards[boards] = counts / self.safe_cells
+            won = boards[self._revealed[boards] == self.safe_cells]
+            rewards[won] += self.win_reward
+            done[won] = True
+
+        for i in numpy.flatnonzero(done).tolist():
+            self._reset_board(i)
+        return self.observations(), rewards.tolist(), done.tolist()
+
+    def _cascade(self, boards, cells):
+        """
+        Mask of the cells opened by revealing cells[k] on boards[k]. Zero
+        cells are dilated through the neighbour table, one ring per round on
+        every board at once; boards whose cascade has stopped drop out.
+        """
+        hidden = self._view_array[boards] == VIEW_HIDDEN
+        zero = self._adjacent_array[boards] == 0
+        opened = numpy.zeros(hidden.shape, dtype=bool)
+        opened[numpy.arange(boards.size), cells] = True
+        frontier = opened & zero
+        active = numpy.arange(boards.size)
+        while True:
+            keep = frontier.any(axis=1)
+            active, frontier = active[keep], frontier[keep]
+            if not active.size:
+                return opened
+            padded = numpy.zeros((active.size, self.cells + 1), dtype=bool)
+            padded[:, :-1] = frontier
+            new = (padded[:, self._neighbor_array].any(axis=2)
+                   & hidden[active] & ~opened[active])
+            opened[active] |= new
+            frontier = new & zero[active]
+
+
+def verify_against_game(num_envs: int = 64, steps: int = 200, width: int = 9,
+                        height: int = 9, mines: int = 10, seed: int = 0,
+                        topology: Topology = Topology.SQUARE,
+                        vectorized: Optional[bool] = None) -> int:
+    """
+    Play random moves on the batched environment and on one MinesweeperGame
+    per board with the same seeds, and check that views, wins and losses
+    agree after every step. Returns the number of board-steps compared.
+    """
+    env = BatchedMinesweeperEnv(num_envs, width, height, mines, seed=seed,
+                                topology=topology, vectorized=vectorized)
+    games = [MinesweeperGame(width, height, mines, seed=s, topology=topology)
+             for s in env.seeds]
+    rng = random.Random(seed)
+    cells = width * height
+    compared = 0
+
+    for _ in range(steps):
+        actions = [rng.randrange(cells) for _ in range(num_envs)]
+        expected_states = []
+        for game, action in zip(games, actions):
+            row, col = divmod(action, width)
+            if not game.grid[row][col].is_revealed:
+                game.click_cell(row, col)
+            expected_states.append(game.game_state)
+
+        observations, _, dones = env.step(actions)
+        flat = observations.tobytes()
+        for i, game in enumerate(games):
+            done = expected_states[i] in [GameState.WON, GameState.LOST]
+            if dones[i] != done:
+                raise AssertionError(f"board {i}: done={dones[i]}, game is {game.game_state}")
+            if done:
+                games[i] = MinesweeperGame(width, height, mines, seed=env.seeds[i],
+                                           topology=topology)
+            if flat[i * cells:(i + 1) * cells] != bytes(games[i].get_view()):
+                raise AssertionError(f"board {i}: view differs from MinesweeperGame")
+            compared += 1
+    return compared
+
+
+def benchmark(sizes: Sequence[int] = (1, 4, 16, 64, 256, 1024, 4096),
+              steps_per_size: int = 50_000, width: int = 9, height: int = 9,
+              mines: int = 10):
+    """Print environment steps per second for each batch size."""
+    cells = width * height
+    rng = random.Random(0)
+
+    game = MinesweeperGame(width, height, mines, seed=0)
+    start = time.perf_counter()
+    for _ in range(steps_per_size):
+        row, col = divmod(rng.randrange(cells), width)
+        if not game.grid[row][col].is_revealed:
+            game.click_cell(row, col)
+        if game.game_state in [GameState.WON, GameState.LOST]:
+            game.reset_game()
+    print(f"MinesweeperGame: {steps_per_size / (time.perf_counter() - start):,.0f} steps/s")
+    print("batched: stdlib" + (" / numpy" if numpy is not None else ""))
+
+    modes = [False] if numpy is None else [False, True]
+    for n in sizes:
+        calls = max(1, steps_per_size // n)
+        actions = [[rng.randrange(cells) for _ in range(n)] for _ in range(min(calls, 64))]
+        rates = []
+        for vectorized in modes:
+            env = BatchedMinesweeperEnv(n, width, height, mines, seed=0,
+                                        vectorized=vectorized)
+            start = time.perf_counter()
+            for k in range(calls):
+                env.step(actions[k % len(actions)])
+            rates.append(f"{calls * n / (time.perf_counter() - start):,.0f}")
+        print(f"N={n:5d}: {' / '.join(rates)} steps/s")
+
+
+if __name__ == "__main__":
+    for topology in Topology:
+        for vectorized in [False] if numpy is None else [False, True]:
+            compared = verify_against_game(topology=topology, vectorized=vectorized)
+            print(f"verified {compared:,} {topology.value} board-steps against "
+                  f"MinesweeperGame ({'numpy' if vectorized else 'stdlib'})")
+    benchmark()
@@ -5,7 +5,15 @@ Handles mine placement, cell operations, and game state.
 
 import random
 from enum import Enum
-from typing import List, Tuple, Set
+from functools import lru_cache
+from typing import Callable, List, Tuple, Set, Optional
+
+
+# Cell codes used by MinesweeperGame.get_view(); revealed cells use 0-8
+VIEW_HIDDEN = 9
+VIEW_FLAGGED = 10
+VIEW_QUESTIONED = 11
+VIEW_MINE = 12
 
 
 class CellState(Enum):
@@ -24,6 +32,72 @@ class GameState(Enum):
     LOST = "lost"
 
 
+class Topology(Enum):
+    """How cells connect to their neighbours."""
+    SQUARE = "square"   # Classic board, 8 neighbours inside the edges
+    TORUS = "torus"     # Square board whose edges wrap around
+    HEX = "hex"         # Hexagonal cells, odd rows shifted right, 6 neighbours
+
+
+# Hex neighbour offsets for (even, odd) rows in "odd-r" offset coordinates
+_HEX_OFFSETS = (
+    ((-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0)),
+    ((-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1)),
+)
+_SQUARE_OFFSETS = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                        if dr or dc)
+
+
+class NeighborTable:
+    """
+    Precomputed neighbours of every cell for one board shape.
+    indices[i] holds the row-major indices around cell i and coords[i] the
+    same cells as (row, col) pairs. Tables are immutable and shared; get one
+    through get_neighbor_table().
+    """
+    
+    def __init__(self, width: int, height: int, topology: Topology):
+        self.width = width
+        self.height = height
+        self.topology = topology
+        
+        indices = []
+        for row in range(height):
+            for col in range(width):
+                if topology == Topology.HEX:
+                    offsets = _HEX_OFFSETS[row % 2]
+                else:
+                    offsets = _SQUARE_OFFSETS
+                around = []
+                for dr, dc in offsets:
+                    nr, nc = row + dr, col + dc
+                    if topology == Topology.TORUS:
+                        nr, nc = nr % height, nc % width
+                    elif not (0 <= nr < height and 0 <= nc < width):
+                        continue
+                    index = nr * width + nc
+                    # Tiny tori can wrap onto the cell itself or repeat a cell
+                    if index != row * width + col and index not in around:
+                        around.append(index)
+                indices.append(tuple(around))
+        
+        self.indices: Tuple[Tuple[int, ...], ...] = tuple(indices)
+        self.coords: Tuple[Tuple[Tuple[int, int], ...], ...] = tuple(
+            tuple(divmod(n, width) for n in around) for around in indices
+        )
+
+
+@lru_cache(maxsize=None)
+def _cached_neighbor_table(width: int, height: int, topology: Topology) -> NeighborTable:
+    return NeighborTable(width, height, topology)
+
+
+def get_neighbor_table(width: int, height: int,
+                       topology: Topology = Topology.SQUARE) -> NeighborTable:
+    """Get the shared neighbour table for a board shape."""
+    return _cached_neighbor_table(width, height, topology)
+
+
 class Difficulty:
     """Predefined difficulty levels matching Windows 3.11 Minesweeper."""
     BEGINNER = {"width": 9, "height": 9, "mines": 10}
@@ -31,6 +105,17 @@ class Difficulty:
     EXPERT = {"width": 30, "height": 16, "mines": 99}
 
 
+# Difficulty presets by the names used in settings and on the command line
+DIFFICULTY_CONFIGS = {
+    "beginner": Difficulty.BEGINNER,
+    "intermediate": Difficulty.INTERMEDIATE,
+    "expert": Difficulty.EXPERT,
+}
+
+# (width, height, mines) identifying a board configuration
+BoardConfig = Tuple[int, int, int]
+
+
 class Cell:
     """Represents a single cell in the minesweeper grid."""
     
@@ -75,29 +160,51 @@ class Cell:
 class MinesweeperGame:
     """Main game logic class for Minesweeper."""
     
-    def __init__(self, width: int = 9, height: int = 9, mines: int = 10):
+    def __init__(self, width: int = 9, height: int = 9, mines: int = 10,
+                 seed: Optional[int] = None, topology: Topology = Topology.SQUARE):
         self.width = width
         self.height = height
         self.mine_count = mines
+        self.topology = topology
         self.grid: List[List[Cell]] = []
+        self.cells: List[Cell] = []  # The grid's cells in row-major order
         self.game_state = GameState.NOT_STARTED
         self.flags_placed = 0
         self.cells_revealed = 0
+        self.clicks = 0
         self.start_time = None
         self.end_time = None
+        self.seed = 0
+        self.first_click: Optional[int] = None  # Row-major index, set when mines are placed
+        self._rng = random.Random()
+        self._move_listeners: List[Callable[["MinesweeperGame", str, int, int], None]] = []
+        self.neighbors = get_neighbor_table(width, height, topology)
         
         self._initialize_grid()
+        self._seed_rng(seed)
+    
+    def _seed_rng(self, seed: Optional[int]):
+        """
+        Seed the mine placement RNG. Placement also avoids the first clicked
+        cell, so the seed together with first_click regenerates the board.
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self._rng.seed(seed)
     
     def _initialize_grid(self):
         """Initialize the game grid with empty cells."""
         self.grid = [[Cell() for _ in range(self.width)] for _ in range(self.height)]
+        self.cells = [cell for row in self.grid for cell in row]
     
     def _place_mines(self, first_click_row: int, first_click_col: int):
         """Place mines randomly on the grid, avoiding the first clicked cell."""
+        self.first_click = first_click_row * self.width + first_click_col
         mines_placed = 0
         while mines_placed < self.mine_count:
-            row = random.randint(0, self.height - 1)
-            col = random.randint(0, self.width - 1)
+            row = self._rng.randint(0, self.height - 1)
+            col = self._rng.randint(0, self.width - 1)
             
             # Don't place mine on first click or if already has mine
             if (row == first_click_row and col == first_click_col) or self.grid[row][col].is_mine:
@@ -110,31 +217,33 @@ class MinesweeperGame:
     
     def _calculate_adjacent_mines(self):
         """Calculate the number of adjacent mines for each cell."""
-        for row in range(self.height):
-            for col in range(self.width):
-                if not self.grid[row][col].is_mine:
-                    count = 0
-                    for dr in [-1, 0, 1]:
-                        for dc in [-1, 0, 1]:
-                            if dr == 0 and dc == 0:
-                                continue
-                            nr, nc = row + dr, col + dc
-                            if (0 <= nr < self.height and 0 <= nc < self.width and 
-                                self.grid[nr][nc].is_mine):
-                                count += 1
-                    self.grid[row][col].adjacent_mines = count
-    
-    def _get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
+        cells = self.cells
+        for cell in cells:
+            cell.adjacent_mines = 0
+        for index, cell in enumerate(cells):
+            if cell.is_mine:
+                for n in self.neighbors.indices[index]:
+                    cells[n].adjacent_mines += 1
+    
+    def _get_neighbors(self, row: int, col: int) -> Tuple[Tuple[int, int], ...]:
         """Get all valid neighboring cell coordinates."""
-        neighbors = []
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < self.height and 0 <= nc < self.width:
-                    neighbors.append((nr, nc))
-        return neighbors
+        return self.neighbors.coords[row * self.width + col]
+    
+    def add_move_listener(self, listener: Callable[["MinesweeperGame", str, int, int], None]):
+        """
+        Call listener(game, move, row, col) after every move that was applied.
+        move is "click", "flag" or "reset" (row and col are -1 for resets).
+        """
+        self._move_listeners.append(listener)
+    
+    def remove_move_listener(self, listener: Callable[["MinesweeperGame", str, int, int], None]):
+        """Stop calling a listener added with add_move_listener."""
+        self._move_listeners.remove(listener)
+    
+    def _notify_move(self, move: str, row: int, col: int):
+        """Tell every move listener about an applied move."""
+        for listener in list(self._move_listeners):
+            listener(self, move, row, col)
     
     def click_cell(self, row: int, col: int) -> bool:
         """
@@ -156,11 +265,15 @@ class MinesweeperGame:
         if cell.is_flagged:
             return True
         
+        if not cell.is_revealed:
+            self.clicks += 1
+        
         # Reveal the cell
         if cell.reveal():
             # Hit a mine
             self.game_state = GameState.LOST
             self._reveal_all_mines()
+            self._notify_move("click", row, col)
             return False
         
         # If it's an empty cell (no adjacent mines), reveal neighbors
@@ -169,28 +282,30 @@ class MinesweeperGame:
         
         self._update_revealed_count()
         self._check_win_condition()
+        self._notify_move("click", row, col)
         return True
     
     def _reveal_empty_area(self, row: int, col: int):
-        """Recursively reveal empty areas (flood fill)."""
-        stack = [(row, col)]
-        visited = set()
+        """Reveal the empty area around an already revealed cell (flood fill)."""
+        cells = self.cells
+        neighbors = self.neighbors.indices
+        start = row * self.width + col
+        stack = [start]
+        visited = {start}
         
         while stack:
-            r, c = stack.pop()
-            if (r, c) in visited:
+            index = stack.pop()
+            # Only cells with no adjacent mines spread to their neighbors
+            if cells[index].adjacent_mines != 0:
                 continue
-            visited.add((r, c))
-            
-            cell = self.grid[r][c]
-            if not cell.is_revealed and not cell.is_flagged:
-                cell.is_revealed = True
-                
-                # If this cell has no adjacent mines, add its neighbors
-                if cell.adjacent_mines == 0:
-                    for nr, nc in self._get_neighbors(r, c):
-                        if (nr, nc) not in visited:
-                            stack.append((nr, nc))
+            for n in neighbors[index]:
+                if n in visited:
+                    continue
+                visited.add(n)
+                cell = cells[n]
+                if not cell.is_revealed and not cell.is_flagged:
+                    cell.is_revealed = True
+                    stack.append(n)
     
     def _reveal_all_mines(self):
         """Reveal all mines when the game is lost."""
@@ -219,6 +334,8 @@ class MinesweeperGame:
         
         cell = self.grid[row][col]
         old_flagged = cell.is_flagged
+        if not cell.is_revealed:
+            self.clicks += 1
         cell.flag()
         
         # Update flag count
@@ -226,23 +343,89 @@ class MinesweeperGame:
             self.flags_placed += 1
         elif not cell.is_flagged and old_flagged:
             self.flags_placed -= 1
+        self._notify_move("flag", row, col)
+    
+    def calculate_3bv(self) -> int:
+        """
+        Calculate the board's 3BV (Bechtel's Board Benchmark Value).
+        This is the minimum number of left clicks needed to clear the board:
+        one per opening plus one per numbered cell not bordering an opening.
+        Returns 0 before mines have been placed.
+        """
+        if self.game_state == GameState.NOT_STARTED:
+            return 0
+        
+        bbbv = 0
+        marked = set()
+        for row in range(self.height):
+            for col in range(self.width):
+                cell = self.grid[row][col]
+                if cell.is_mine or cell.adjacent_mines != 0 or (row, col) in marked:
+                    continue
+                # Flood the opening, marking its numbered border as well
+                bbbv += 1
+                stack = [(row, col)]
+                marked.add((row, col))
+                while stack:
+                    r, c = stack.pop()
+                    for nr, nc in self._get_neighbors(r, c):
+                        if (nr, nc) in marked:
+                            continue
+                        marked.add((nr, nc))
+                        if self.grid[nr][nc].adjacent_mines == 0:
+                            stack.append((nr, nc))
+        
+        for row in range(self.height):
+            for col in range(self.width):
+                if not self.grid[row][col].is_mine and (row, col) not in marked:
+                    bbbv += 1
+        return bbbv
+    
+    def get_view(self) -> bytearray:
+        """
+        Get what the player can see as one byte per cell in row-major order.
+        Revealed cells hold their adjacent mine count (or VIEW_MINE); unrevealed
+        cells hold VIEW_HIDDEN, VIEW_FLAGGED or VIEW_QUESTIONED.
+        """
+        view = bytearray(self.width * self.height)
+        i = 0
+        for row in self.grid:
+            for cell in row:
+                if cell.is_revealed:
+                    view[i] = VIEW_MINE if cell.is_mine else cell.adjacent_mines
+                elif cell.is_flagged:
+                    view[i] = VIEW_FLAGGED
+                elif cell.is_questioned:
+                    view[i] = VIEW_QUESTIONED
+                else:
+                    view[i] = VIEW_HIDDEN
+                i += 1
+        return view
     
     def get_remaining_mines(self) -> int:
         """Get the number of mines remaining (mines - flags)."""
         return self.mine_count - self.flags_placed
     
-    def reset_game(self, width: int = None, height: int = None, mines: int = None):
-        """Reset the game with new parameters."""
+    def reset_game(self, width: int = None, height: int = None, mines: int = None,
+                   seed: Optional[int] = None, topology: Optional[Topology] = None):
+        """Reset the game with new parameters. A new seed is drawn if none is given."""
         if width is not None:
             self.width = width
         if height is not None:
             self.height = height
         if mines is not None:
             self.mine_count = mines
+        if topology is not None:
+            self.topology = topology
             
         self.game_state = GameState.NOT_STARTED
         self.flags_placed = 0
         self.cells_revealed = 0
+        self.clicks = 0
         self.start_time = None
         self.end_time = None
-        self._initialize_grid()
\ No newline at end of file
+        self.first_click = None
+        self.neighbors = get_neighbor_table(self.width, self.height, self.topology)
+        self._initialize_grid()
+        self._seed_rng(seed)
+        self._notify_move("reset", -1, -1)
@@ -4,10 +4,14 @@ Tkinter GUI for Minesweeper that recreates the Windows 3.11 appearance.
 
 import tkinter as tk
 from tkinter import messagebox, Menu
+import sqlite3
 import time
 from typing import Optional
 
 from ..game import MinesweeperGame, GameState, Difficulty, CellState
+from ..solver import ProbabilityWorker
+from ..spectate import SpectatorBroadcast, SpectatorServer
+from ..stats import StatsStore
 
 
 class MinesweeperGUI:
@@ -23,6 +27,8 @@ class MinesweeperGUI:
         'text': '#000000',
         'mine_red': '#ff0000',
         'flag_red': '#ff0000',
+        'heatmap_safe': '#80ff80',
+        'heatmap_mine': '#ff0000',
         'numbers': {
             1: '#0000ff',  # Blue
             2: '#008000',  # Green
@@ -35,9 +41,13 @@ class MinesweeperGUI:
         }
     }
     
-    def __init__(self):
+    FRAME_BUDGET = 0.008   # Seconds per Tk callback for cell updates and their redraw
+    CASCADE_STEP_MS = 15   # Delay between rings of an animated cascade
+    
+    def __init__(self, stats_store: Optional[StatsStore] = None):
         self.root = tk.Tk()
         self.game: Optional[MinesweeperGame] = None
+        self.stats_store = stats_store
         self.cell_buttons = []
         self.mines_label = None
         self.timer_label = None
@@ -45,6 +55,21 @@ class MinesweeperGUI:
         self.start_time = None
         self.timer_running = False
         self.last_cell_states = {}  # Track cell states to minimize updates
+        self.pending_cells = {}  # Cells waiting to be redrawn, mapped to cascade ring
+        self.flush_job = None
+        self.last_click = None
+        self.worst_frame_time = 0.0
+        self.cell_draw_cost = 0.0  # Seconds per cell, including Tk's idle redraw
+        self.cascade_var = tk.BooleanVar(master=self.root, value=False)
+        self.heatmap_var = tk.BooleanVar(master=self.root, value=False)
+        self.heatmap_worker: Optional[ProbabilityWorker] = None
+        self.heatmap_job = 0
+        self.heatmap_polling = False
+        self.heatmap_tints = {}  # Overlay colour currently shown on each hidden cell
+        self.broadcast_var = tk.BooleanVar(master=self.root, value=False)
+        self.broadcast_lan_var = tk.BooleanVar(master=self.root, value=False)
+        self.broadcast: Optional[SpectatorBroadcast] = None
+        self.spectator_server: Optional[SpectatorServer] = None
         
         self._setup_window()
         self._create_menu()
@@ -80,10 +105,24 @@ class MinesweeperGUI:
         game_menu.add_command(label="Expert", 
                              command=lambda: self.new_game(Difficulty.EXPERT))
         game_menu.add_separator()
+        game_menu.add_checkbutton(label="Probability Overlay",
+                                  variable=self.heatmap_var,
+                                  command=self._toggle_heatmap)
+        game_menu.add_checkbutton(label="Animated Cascade",
+                                  variable=self.cascade_var)
+        game_menu.add_separator()
+        game_menu.add_checkbutton(label="Broadcast Game",
+                                  variable=self.broadcast_var,
+                                  command=self._toggle_broadcast)
+        game_menu.add_checkbutton(label="Allow LAN Spectators",
+                                  variable=self.broadcast_lan_var,
+                                  command=self._toggle_broadcast)
+        game_menu.add_separator()
         game_menu.add_command(label="Exit", command=self.root.quit)
         
         help_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_command(label="Statistics", command=self._show_statistics)
         help_menu.add_command(label="About", command=self._show_about)
     
     def _show_about(self):
@@ -97,12 +136,40 @@ class MinesweeperGUI:
             "Goal: Reveal all cells without hitting mines!"
         )
     
+    def _show_statistics(self):
+        """Show statistics for the current board configuration."""
+        if self.stats_store is None:
+            messagebox.showinfo("Statistics", "Statistics are not being recorded.")
+            return
+        
+        config = (self.game.width, self.game.height, self.game.mine_count)
+        summary = self.stats_store.summary(config)
+        best = self.stats_store.best_times(config, limit=1)
+        median = self.stats_store.percentile(config, 50)
+        recent = self.stats_store.win_rate(config, last_games=100)
+        messagebox.showinfo(
+            "Statistics",
+            f"Board: {config[0]}x{config[1]}, {config[2]} mines\n\n"
+            f"Games played: {summary['played']}\n"
+            f"Games won: {summary['won']} ({summary['win_rate']:.0%})\n"
+            f"Win rate (last 100): {recent or 0:.0%}\n"
+            f"Best time: {f'{best[0]:.1f}s' if best else '-'}\n"
+            f"Median winning time: {f'{median:.1f}s' if median is not None else '-'}"
+        )
+    
+    def _record_game(self):
+        """Queue the finished game for the statistics store."""
+        if self.stats_store is not None:
+            elapsed = time.time() - self.start_time if self.start_time else 0.0
+            self.stats_store.record_game(self.game, elapsed)
+    
     def new_game(self, difficulty: dict = None):
         """Start a new game with the specified difficulty."""
         if difficulty is None:
             difficulty = Difficulty.BEGINNER
             
         # Clear existing widgets
+        self._cancel_pending_cells()
         for widget in self.root.winfo_children():
             if isinstance(widget, tk.Frame):
                 widget.destroy()
@@ -113,10 +180,14 @@ class MinesweeperGUI:
             height=difficulty["height"],
             mines=difficulty["mines"]
         )
+        if self.broadcast is not None:
+            self.broadcast.attach(self.game)
         
         self.timer_running = False
         self.start_time = None
         self.last_cell_states = {}  # Reset cell state tracking
+        self.heatmap_tints = {}
+        self.last_click = None
         
         self._create_widgets()
         self._update_display()
@@ -233,16 +304,19 @@ class MinesweeperGUI:
             self.timer_running = True
         
         # Click the cell
+        self.last_click = (row, col)
         continue_game = self.game.click_cell(row, col)
         
         if not continue_game:
             # Game lost
             self.timer_running = False
+            self._record_game()
             self.smiley_button.config(text="😵", bg='#ffff00')
             messagebox.showinfo("Game Over", "You hit a mine! Game Over.")
         elif self.game.game_state == GameState.WON:
             # Game won
             self.timer_running = False
+            self._record_game()
             self.smiley_button.config(text="😎", bg='#ffff00')
             elapsed = int(time.time() - self.start_time) if self.start_time else 0
             messagebox.showinfo("Congratulations!", 
@@ -269,11 +343,11 @@ class MinesweeperGUI:
         remaining = self.game.get_remaining_mines()
         self.mines_label.config(text=f"{remaining:03d}")
         
-        # Update grid - only update cells that have changed
+        # Update grid - only queue cells that have changed
+        changed = []
         for row in range(self.game.height):
             for col in range(self.game.width):
                 cell = self.game.grid[row][col]
-                btn = self.cell_buttons[row][col]
                 
                 # Create a state key for this cell
                 state_key = (row, col)
@@ -282,71 +356,264 @@ class MinesweeperGUI:
                 # Only update if state has changed
                 if state_key not in self.last_cell_states or self.last_cell_states[state_key] != current_state:
                     self.last_cell_states[state_key] = current_state
-                    
-                    if cell.state == CellState.FLAGGED:
-                        btn.config(
-                            text="🚩",
-                            bg=self.COLORS['button_face'],
-                            relief=tk.RAISED,
-                            fg=self.COLORS['text'],
-                            state=tk.NORMAL,  # Keep enabled for unflagging
-                            bd=2
-                        )
-                    elif cell.state == CellState.QUESTIONED:
-                        btn.config(
-                            text="?",
-                            bg=self.COLORS['button_face'],
-                            relief=tk.RAISED,
-                            fg=self.COLORS['text'],
-                            state=tk.NORMAL,  # Keep enabled for cycling
-                            bd=2
-                        )
-                    elif cell.state == CellState.REVEALED:
-                        # Disable button functionality for revealed cells
-                        btn.config(state=tk.DISABLED)
-                        
-                        if cell.is_mine:
-                            # Show mine
-                            btn.config(
-                                text="💣",
-                                bg=self.COLORS['mine_red'],
-                                relief=tk.FLAT,  # Changed from SUNKEN to FLAT for flatter appearance
-                                fg=self.COLORS['text'],
-                                bd=1,  # Reduced border for flatter look
-                                disabledforeground=self.COLORS['text']  # Ensure text shows when disabled
-                            )
-                        elif cell.adjacent_mines > 0:
-                            # Show number
-                            color = self.COLORS['numbers'].get(cell.adjacent_mines, 
-                                                             self.COLORS['text'])
-                            btn.config(
-                                text=str(cell.adjacent_mines),
-                                bg=self.COLORS['background'],
-                                relief=tk.FLAT,  # Changed from SUNKEN to FLAT for flatter appearance
-                                fg=color,
-                                bd=1,  # Reduced border for flatter look
-                                disabledforeground=color  # Ensure text shows when disabled
-                            )
-                        else:
-                            # Empty cell
-                            btn.config(
-                                text="",
-                                bg=self.COLORS['background'],
-                                relief=tk.FLAT,  # Changed from SUNKEN to FLAT for flatter appearance
-                                fg=self.COLORS['text'],
-                                bd=1,  # Reduced border for flatter look
-                                disabledforeground=self.COLORS['text']  # Ensure text shows when disabled
-                            )
-                    else:
-                        # Hidden cell - ensure it's enabled
-                        btn.config(
-                            text="",
-                            bg=self.COLORS['button_face'],
-                            relief=tk.RAISED,
-                            fg=self.COLORS['text'],
-                            state=tk.NORMAL,  # Re-enable button
-                            bd=2  # Full border for raised appearance
-                        )
+                    changed.append(state_key)
+        
+        self._queue_cells(changed)
+        self._request_heatmap()
+    
+    def _queue_cells(self, cells):
+        """
+        Queue cells for redrawing. Large reveals are drawn over several Tk
+        callbacks by _flush_pending_cells so input is handled in between.
+        With the animated cascade on, cells are grouped into rings around
+        the last click and each ring is drawn on its own frame.
+        """
+        animate = self.cascade_var.get() and self.last_click is not None
+        if animate:
+            r0, c0 = self.last_click
+            cells = sorted(cells, key=lambda rc: max(abs(rc[0] - r0), abs(rc[1] - c0)))
+        for row, col in cells:
+            distance = max(abs(row - r0), abs(col - c0)) if animate else 0
+            self.pending_cells.pop((row, col), None)  # Re-queue at the back
+            self.pending_cells[(row, col)] = distance
+        
+        if self.pending_cells and self.flush_job is None:
+            self.flush_job = self.root.after_idle(self._flush_pending_cells)
+    
+    def _flush_pending_cells(self):
+        """
+        Draw queued cells until the frame budget or the current ring runs out.
+        Tk repaints configured buttons later in idle handlers, so the chunk
+        is painted with update_idletasks() inside the timed region and the
+        measured cost per cell sizes the next chunk. Until that cost is known
+        a single cell is drawn, since the repaint can't be timed in advance.
+        """
+        self.flush_job = None
+        start = time.perf_counter()
+        limit = (max(1, self.FRAME_BUDGET / self.cell_draw_cost)
+                 if self.cell_draw_cost else 1)
+        ring = None
+        drawn = 0
+        while self.pending_cells and drawn + 1 <= limit:  # Only whole cells that fit
+            (row, col), distance = next(iter(self.pending_cells.items()))
+            if ring is None:
+                ring = distance
+            elif distance != ring:
+                break
+            del self.pending_cells[(row, col)]
+            self._render_cell(row, col)
+            drawn += 1
+            if time.perf_counter() - start >= self.FRAME_BUDGET:
+                break
+        self.root.update_idletasks()
+        elapsed = time.perf_counter() - start
+        self.worst_frame_time = max(self.worst_frame_time, elapsed)
+        if drawn:
+            cost = elapsed / drawn
+            self.cell_draw_cost = (cost if not self.cell_draw_cost
+                                   else 0.5 * (self.cell_draw_cost + cost))
+        
+        if self.pending_cells:
+            next_distance = next(iter(self.pending_cells.values()))
+            if next_distance != ring:
+                self.flush_job = self.root.after(self.CASCADE_STEP_MS,
+                                                 self._flush_pending_cells)
+            else:
+                self.flush_job = self.root.after_idle(self._flush_pending_cells)
+    
+    def _cancel_pending_cells(self):
+        """Drop queued redraws, e.g. before the grid is destroyed."""
+        if self.flush_job is not None:
+            self.root.after_cancel(self.flush_job)
+            self.flush_job = None
+        self.pending_cells = {}
+    
+    def _render_cell(self, row: int, col: int):
+        """Configure a cell's button to match the cell's current state."""
+        cell = self.game.grid[row][col]
+        btn = self.cell_buttons[row][col]
+        
+        if cell.state == CellState.FLAGGED:
+            btn.config(
+                text="🚩",
+                bg=self.COLORS['button_face'],
+                relief=tk.RAISED,
+                fg=self.COLORS['text'],
+                state=tk.NORMAL,  # Keep enabled for unflagging
+                bd=2
+            )
+        elif cell.state == CellState.QUESTIONED:
+            btn.config(
+                text="?",
+                bg=self.COLORS['button_face'],
+                relief=tk.RAISED,
+                fg=self.COLORS['text'],
+                state=tk.NORMAL,  # Keep enabled for cycling
+                bd=2
+            )
+        elif cell.state == CellState.REVEALED:
+            # Disable button functionality for revealed cells
+            btn.config(state=tk.DISABLED)
+            
+            if cell.is_mine:
+                # Show mine
+                btn.config(
+                    text="💣",
+                    bg=self.COLORS['mine_red'],
+                    relief=tk.FLAT,  # Changed from SUNKEN to FLAT for flatter appearance
+                    fg=self.COLORS['text'],
+                    bd=1,  # Reduced border for flatter look
+                    disabledforeground=self.COLORS['text']  # Ensure text shows when disabled
+                )
+            elif cell.adjacent_mines > 0:
+                # Show number
+                color = self.COLORS['numbers'].get(cell.adjacent_mines, 
+                                                 self.COLORS['text'])
+                btn.config(
+                    text=str(cell.adjacent_mines),
+                    bg=self.COLORS['background'],
+                    relief=tk.FLAT,  # Changed from SUNKEN to FLAT for flatter appearance
+                    fg=color,
+                    bd=1,  # Reduced border for flatter look
+                    disabledforeground=color  # Ensure text shows when disabled
+                )
+            else:
+                # Empty cell
+                btn.config(
+                    text="",
+                    bg=self.COLORS['background'],
+                    relief=tk.FLAT,  # Changed from SUNKEN to FLAT for flatter appearance
+                    fg=self.COLORS['text'],
+                    bd=1,  # Reduced border for flatter look
+                    disabledforeground=self.COLORS['text']  # Ensure text shows when disabled
+                )
+        else:
+            # Hidden cell - ensure it's enabled
+            btn.config(
+                text="",
+                bg=self.heatmap_tints.get((row, col), self.COLORS['button_face']),
+                relief=tk.RAISED,
+                fg=self.COLORS['text'],
+                state=tk.NORMAL,  # Re-enable button
+                bd=2  # Full border for raised appearance
+            )
+    
+    def _toggle_heatmap(self):
+        """Turn the mine probability overlay on or off."""
+        if self.heatmap_var.get():
+            self._request_heatmap()
+        else:
+            if self.heatmap_worker is not None:
+                self.heatmap_worker.cancel()
+            self._clear_heatmap()
+    
+    def _toggle_broadcast(self):
+        """
+        Start, stop or rebind the spectator server to match the menu. It
+        listens on this computer only unless LAN spectators are allowed;
+        there is no authentication, so only allow them on trusted networks.
+        """
+        self._stop_broadcast()
+        if not self.broadcast_var.get():
+            return
+        host = "0.0.0.0" if self.broadcast_lan_var.get() else "127.0.0.1"
+        self.broadcast = SpectatorBroadcast(self.game)
+        try:
+            self.spectator_server = SpectatorServer(self.broadcast, host)
+        except OSError as e:
+            self._stop_broadcast()
+            self.broadcast_var.set(False)
+            messagebox.showerror("Broadcast", f"Could not start the spectator server: {e}")
+            return
+        _, port = self.spectator_server.start()
+        messagebox.showinfo(
+            "Broadcast",
+            f"Spectators can watch on port {port}"
+            + (" from the local network." if host == "0.0.0.0" else " from this computer.")
+            + f"\n\npython -m minesweeper.spectate HOST {port}"
+        )
+    
+    def _stop_broadcast(self):
+        """Disconnect spectators and stop following the game."""
+        if self.spectator_server is not None:
+            self.spectator_server.stop()
+            self.spectator_server = None
+        if self.broadcast is not None:
+            self.broadcast.detach()
+            self.broadcast = None
+    
+    def _request_heatmap(self):
+        """
+        Hand the current board to the background probability worker.
+        Only a byte snapshot is taken here; any calculation still running for
+        an earlier move is cancelled, so clicks never wait on the solver.
+        """
+        if not self.heatmap_var.get():
+            return
+        if self.game.game_state in [GameState.WON, GameState.LOST]:
+            if self.heatmap_worker is not None:
+                self.heatmap_worker.cancel()
+            self._clear_heatmap()
+            return
+        
+        if self.heatmap_worker is None:
+            self.heatmap_worker = ProbabilityWorker()
+        self.heatmap_job = self.heatmap_worker.submit(
+            self.game.get_view(), self.game.width, self.game.height,
+            self.game.mine_count, self.game.topology
+        )
+        if not self.heatmap_polling:
+            self.heatmap_polling = True
+            self.root.after(20, self._poll_heatmap)
+    
+    def _poll_heatmap(self):
+        """Apply a finished probability calculation, or keep waiting for one."""
+        if (not self.heatmap_var.get() or
+            self.game.game_state in [GameState.WON, GameState.LOST]):
+            self.heatmap_polling = False
+            return
+        
+        result = self.heatmap_worker.poll()
+        if result is not None and result[0] == self.heatmap_job:
+            self.heatmap_polling = False
+            self._apply_heatmap(result[1])
+            return
+        self.root.after(20, self._poll_heatmap)
+    
+    def _heatmap_color(self, probability: float) -> str:
+        """Blend the button face towards red as the mine probability rises."""
+        if probability == 0:
+            return self.COLORS['heatmap_safe']
+        face = self.COLORS['button_face']
+        mine = self.COLORS['heatmap_mine']
+        # Quantise to 5% steps so small changes don't reconfigure buttons
+        t = round(probability * 20) / 20
+        channels = []
+        for i in (1, 3, 5):
+            a, b = int(face[i:i + 2], 16), int(mine[i:i + 2], 16)
+            channels.append(round(a + (b - a) * t))
+        return '#%02x%02x%02x' % tuple(channels)
+    
+    def _apply_heatmap(self, probabilities):
+        """Tint hidden cells by probability, touching only cells that changed."""
+        for row in range(self.game.height):
+            for col in range(self.game.width):
+                cell = self.game.grid[row][col]
+                probability = probabilities[row * self.game.width + col]
+                if cell.state != CellState.HIDDEN or probability is None:
+                    self.heatmap_tints.pop((row, col), None)
+                    continue
+                color = self._heatmap_color(probability)
+                if self.heatmap_tints.get((row, col)) != color:
+                    self.heatmap_tints[(row, col)] = color
+                    self.cell_buttons[row][col].config(bg=color)
+    
+    def _clear_heatmap(self):
+        """Restore the normal face colour on every tinted cell."""
+        for (row, col) in self.heatmap_tints:
+            if self.game.grid[row][col].state == CellState.HIDDEN:
+                self.cell_buttons[row][col].config(bg=self.COLORS['button_face'])
+        self.heatmap_tints = {}
     
     def _update_timer(self):
         """Update the timer display."""
@@ -360,13 +627,77 @@ class MinesweeperGUI:
     
     def run(self):
         """Start the GUI main loop."""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self._stop_broadcast()
+
+
+def benchmark_cascade(width: int = 30, height: int = 24, mines: int = 10, seed: int = 0):
+    """
+    Open a large seeded board, reveal one huge empty region and report,
+    with and without chunking, the longest redraw callback (including Tk's
+    idle repaint) and the longest gap between turns of the event loop, taken
+    from a 1 ms heartbeat. Needs a display, e.g. xvfb-run. Returns the
+    figures of each run, keyed by its label.
+    """
+    app = MinesweeperGUI()
+    heartbeat = {"last": 0.0, "worst": 0.0, "job": None}
+    results = {}
+
+    def beat():
+        now = time.perf_counter()
+        heartbeat["worst"] = max(heartbeat["worst"], now - heartbeat["last"])
+        heartbeat["last"] = now
+        heartbeat["job"] = app.root.after(1, beat)
+
+    try:
+        for budget in [float('inf'), MinesweeperGUI.FRAME_BUDGET]:
+            app.FRAME_BUDGET = budget
+            app.cell_draw_cost = 0.0
+            app.new_game({"width": width, "height": height, "mines": mines})
+            app.game.reset_game(seed=seed)  # Same board for both runs
+            app.root.update()
+            app.game.click_cell(height // 2, width // 2)
+            app.worst_frame_time = 0.0
+            frames = 0
+            heartbeat.update(last=time.perf_counter(), worst=0.0)
+            beat()
+            app._update_display()
+            while app.pending_cells or app.flush_job is not None:
+                app.root.update()
+                frames += 1
+            app.root.update()
+            app.root.after_cancel(heartbeat["job"])
+            label = "unchunked" if budget == float('inf') else f"{budget * 1000:.0f} ms budget"
+            results[label] = {"worst_redraw": app.worst_frame_time,
+                              "worst_gap": heartbeat["worst"], "updates": frames,
+                              "cells_revealed": app.game.cells_revealed}
+            print(f"{label}: worst redraw {app.worst_frame_time * 1000:.1f} ms, "
+                  f"worst event-loop gap {heartbeat['worst'] * 1000:.1f} ms "
+                  f"over {frames} updates, {app.game.cells_revealed} cells revealed")
+    finally:
+        app.root.destroy()
+    return results
 
 
 def main():
     """Main entry point for the GUI application."""
-    app = MinesweeperGUI()
-    app.run()
+    try:
+        stats_store = StatsStore()
+    except (OSError, sqlite3.Error):
+        stats_store = None  # Play without statistics rather than not at all
+    else:
+        try:
+            stats_store.import_settings()
+        except RuntimeError:
+            pass  # Imported again on the next start
+    try:
+        app = MinesweeperGUI(stats_store)
+        app.run()
+    finally:
+        if stats_store is not None:
+            stats_store.close()
 
 
 if __name__ == "__main__":
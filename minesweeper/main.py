@@ -9,13 +9,16 @@ import os
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from minesweeper.gui import main as gui_main
+from minesweeper.gui import main as gui_main, benchmark_cascade
 
 
 def main():
     """Main entry point for the application."""
     try:
-        gui_main()
+        if "--benchmark-cascade" in sys.argv[1:]:
+            benchmark_cascade()
+        else:
+            gui_main()
     except KeyboardInterrupt:
         print("\\nGame interrupted by user.")
         sys.exit(0)
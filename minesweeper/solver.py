@@ -0,0 +1,387 @@
+"""
+Mine probability analysis for Minesweeper.
+
+Works on the byte view from MinesweeperGame.get_view(), with cells addressed
+by their row-major index. Revealed numbers become constraints over their
+hidden neighbours, constraints sharing cells are grouped into independent
+frontier components, and each component's solutions are enumerated once and
+cached, so after a move only the components that move touched are solved
+again.
+"""
+
+import math
+import threading
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from .game import (VIEW_HIDDEN, VIEW_FLAGGED, VIEW_QUESTIONED, Topology,
+                   get_neighbor_table)
+
+
+UNKNOWN_CODES = (VIEW_HIDDEN, VIEW_FLAGGED, VIEW_QUESTIONED)
+
+
+class Cancelled(Exception):
+    """Raised when a calculation is cancelled part way through."""
+
+
+class Constraint(NamedTuple):
+    """A revealed number: exactly `mines` of `cells` are mines."""
+    cells: FrozenSet[int]
+    mines: int
+
+
+class Component(NamedTuple):
+    """A set of constraints that share no cells with any other component."""
+    cells: Tuple[int, ...]
+    constraints: Tuple[Constraint, ...]
+
+    @property
+    def key(self) -> tuple:
+        """Cache key; equal keys always have identical solutions."""
+        return tuple(sorted((tuple(sorted(c.cells)), c.mines) for c in self.constraints))
+
+
+class ComponentSolutions(NamedTuple):
+    """
+    Enumerated solutions of a component, grouped by how many mines they use.
+    by_mines maps a mine count to (number of solutions, per-cell mine counts
+    over those solutions, aligned with Component.cells).
+    """
+    cells: Tuple[int, ...]
+    by_mines: Dict[int, Tuple[int, List[int]]]
+
+
+def find_constraints(view: Sequence[int], width: int, height: int,
+                     topology: Topology = Topology.SQUARE) -> List[Constraint]:
+    """Build one constraint per revealed number that borders a hidden cell."""
+    neighbors = get_neighbor_table(width, height, topology).indices
+    constraints = []
+    for index, code in enumerate(view):
+        if code > 8:
+            continue
+        hidden = frozenset(n for n in neighbors[index] if view[n] in UNKNOWN_CODES)
+        if hidden:
+            constraints.append(Constraint(hidden, code))
+    return constraints
+
+
+def split_components(constraints: List[Constraint]) -> List[Component]:
+    """Group constraints into components connected through shared cells."""
+    parent: Dict[int, int] = {}
+
+    def find(cell: int) -> int:
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for constraint in constraints:
+        cells = iter(constraint.cells)
+        first = next(cells)
+        parent.setdefault(first, first)
+        root = find(first)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            other = find(cell)
+            if other != root:
+                parent[other] = root
+
+    groups: Dict[int, List[Constraint]] = {}
+    for constraint in constraints:
+        groups.setdefault(find(next(iter(constraint.cells))), []).append(constraint)
+
+    components = []
+    for group in groups.values():
+        cells = sorted(set().union(*(c.cells for c in group)))
+        components.append(Component(tuple(cells), tuple(group)))
+    return components
+
+
+def _band_order(component: Component) -> List[int]:
+    """
+    Order cells breadth-first through shared constraints, starting from a
+    peripheral cell, so few constraints are part-assigned at any point.
+    """
+    linked: Dict[int, set] = {cell: set() for cell in component.cells}
+    for constraint in component.constraints:
+        for cell in constraint.cells:
+            linked[cell].update(constraint.cells)
+    start = min(component.cells, key=lambda cell: (len(linked[cell]), cell))
+    order = [start]
+    seen = {start}
+    for cell in order:
+        for other in sorted(linked[cell]):
+            if other not in seen:
+                seen.add(other)
+                order.append(other)
+    return order
+
+
+def _shifted_add(target: Dict[int, int], source: Dict[int, int], shift: int, factor: int = 1):
+    """Add a mine-count distribution, shifted by `shift` mines, into target."""
+    for mines, count in source.items():
+        target[mines + shift] = target.get(mines + shift, 0) + count * factor
+
+
+def enumerate_component(component: Component,
+                        cancel: Optional[threading.Event] = None) -> ComponentSolutions:
+    """
+    Count every mine assignment of a component that satisfies its constraints.
+
+    Cells are assigned in band order and assignments are merged whenever
+    the part-assigned constraints still need the same number of mines, so
+    the cost grows with the width of the frontier rather than with the
+    number of solutions. A forward and a backward pass give the per-cell
+    counts. Raises Cancelled if `cancel` is set while counting.
+    """
+    constraints = component.constraints
+    order = _band_order(component)
+    size = len(order)
+    depth_of = {cell: depth for depth, cell in enumerate(order)}
+
+    touching: List[List[int]] = [[] for _ in order]
+    remaining: Dict[Tuple[int, int], int] = {}  # (constraint, depth) -> cells left after it
+    first = []
+    last = []
+    for ci, constraint in enumerate(constraints):
+        depths = sorted(depth_of[cell] for cell in constraint.cells)
+        for i, depth in enumerate(depths):
+            touching[depth].append(ci)
+            remaining[(ci, depth)] = len(depths) - i - 1
+        first.append(depths[0])
+        last.append(depths[-1])
+
+    # Constraints part-assigned once `depth` cells have been assigned
+    active = [tuple(ci for ci in range(len(constraints)) if first[ci] < depth <= last[ci])
+              for depth in range(size + 1)]
+
+    def check_cancel():
+        if cancel is not None and cancel.is_set():
+            raise Cancelled()
+
+    # Forward pass: mine-count distribution of each reachable state
+    forward: List[Dict[tuple, Dict[int, int]]] = [{(): {0: 1}}]
+    transitions: List[Dict[tuple, List[Tuple[int, tuple]]]] = []
+    for depth in range(size):
+        check_cancel()
+        layer: Dict[tuple, Dict[int, int]] = {}
+        moves: Dict[tuple, List[Tuple[int, tuple]]] = {}
+        for state, counts in forward[depth].items():
+            needed_before = dict(zip(active[depth], state))
+            moves[state] = []
+            for value in (0, 1):
+                needed = dict(needed_before)
+                ok = True
+                for ci in touching[depth]:
+                    left = needed.get(ci, constraints[ci].mines) - value
+                    if left < 0 or left > remaining[(ci, depth)]:
+                        ok = False
+                        break
+                    needed[ci] = left
+                if not ok:
+                    continue
+                next_state = tuple(needed[ci] for ci in active[depth + 1])
+                moves[state].append((value, next_state))
+                _shifted_add(layer.setdefault(next_state, {}), counts, value)
+        forward.append(layer)
+        transitions.append(moves)
+
+    # Backward pass: distribution of mines still to come from each state
+    backward: List[Dict[tuple, Dict[int, int]]] = [{} for _ in range(size)]
+    backward.append({(): {0: 1}})
+    for depth in range(size - 1, -1, -1):
+        check_cancel()
+        for state, moves in transitions[depth].items():
+            counts: Dict[int, int] = {}
+            for value, next_state in moves:
+                after = backward[depth + 1].get(next_state)
+                if after:
+                    _shifted_add(counts, after, value)
+            if counts:
+                backward[depth][state] = counts
+
+    totals = forward[size].get((), {})
+    by_mines: Dict[int, Tuple[int, List[int]]] = {
+        mines: (count, [0] * size) for mines, count in totals.items()
+    }
+    position = {cell: i for i, cell in enumerate(component.cells)}
+    for depth in range(size):
+        check_cancel()
+        index = position[order[depth]]
+        for state, before in forward[depth].items():
+            for value, next_state in transitions[depth][state]:
+                after = backward[depth + 1].get(next_state)
+                if value != 1 or not after:
+                    continue
+                for m1, c1 in before.items():
+                    for m2, c2 in after.items():
+                        by_mines[m1 + m2 + 1][1][index] += c1 * c2
+    return ComponentSolutions(component.cells, by_mines)
+
+
+def _convolve(a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    """Combine two mine-count distributions of independent parts."""
+    result: Dict[int, int] = {}
+    for ma, wa in a.items():
+        for mb, wb in b.items():
+            result[ma + mb] = result.get(ma + mb, 0) + wa * wb
+    return result
+
+
+class ProbabilityCalculator:
+    """
+    Computes the mine probability of every unrevealed cell.
+
+    Component solutions are cached by their constraints, and the cache keeps
+    only components present in the latest board, so a calculation after a
+    move enumerates just the components that move created or changed.
+    """
+
+    def __init__(self):
+        self._cache: Dict[tuple, ComponentSolutions] = {}
+        self.last_solved = 0
+
+    def calculate(self, view: Sequence[int], width: int, height: int, mines: int,
+                  cancel: Optional[threading.Event] = None,
+                  topology: Topology = Topology.SQUARE) -> List[Optional[float]]:
+        """
+        Return the mine probability for each cell in row-major order, or None
+        for revealed cells. Flags are treated as unknown cells. Raises
+        Cancelled if `cancel` is set part way through.
+        """
+        components = split_components(find_constraints(view, width, height, topology))
+        cache: Dict[tuple, ComponentSolutions] = {}
+        solutions = []
+        self.last_solved = 0
+        for component in components:
+            key = component.key
+            solved = cache.get(key) or self._cache.get(key)
+            if solved is None:
+                try:
+                    solved = enumerate_component(component, cancel)
+                except Cancelled:
+                    # Keep finished components for the next attempt
+                    self._cache.update(cache)
+                    raise
+                self.last_solved += 1
+            cache[key] = solved
+            solutions.append(solved)
+        self._cache = cache
+
+        result: List[Optional[float]] = [None] * len(view)
+        frontier = set()
+        for solved in solutions:
+            frontier.update(solved.cells)
+        interior = [i for i, code in enumerate(view)
+                    if code in UNKNOWN_CODES and i not in frontier]
+
+        # Weight of each frontier mine total, leaving one component out at a time
+        weights = [{m: count for m, (count, _) in s.by_mines.items()} for s in solutions]
+        prefix = [{0: 1}]
+        for w in weights:
+            prefix.append(_convolve(prefix[-1], w))
+        suffix = [{0: 1}]
+        for w in reversed(weights):
+            suffix.append(_convolve(suffix[-1], w))
+        suffix.reverse()
+
+        def interior_ways(frontier_mines: int) -> int:
+            rest = mines - frontier_mines
+            if rest < 0 or rest > len(interior):
+                return 0
+            return math.comb(len(interior), rest)
+
+        total = sum(w * interior_ways(m) for m, w in prefix[-1].items())
+        if total == 0:
+            return result  # Inconsistent board, nothing sensible to report
+
+        for i, solved in enumerate(solutions):
+            others = _convolve(prefix[i], suffix[i + 1])
+            cell_weights = [0] * len(solved.cells)
+            for m, (_, cell_counts) in solved.by_mines.items():
+                factor = sum(w * interior_ways(m + om) for om, w in others.items())
+                if factor:
+                    for j, c in enumerate(cell_counts):
+                        cell_weights[j] += c * factor
+            for cell, weight in zip(solved.cells, cell_weights):
+                result[cell] = weight / total
+
+        if interior:
+            expected = sum(w * interior_ways(m) * (mines - m)
+                           for m, w in prefix[-1].items())
+            p = expected / total / len(interior)
+            for cell in interior:
+                result[cell] = p
+        return result
+
+
+class ProbabilityWorker:
+    """
+    Background thread running a ProbabilityCalculator.
+
+    submit() never blocks: it cancels any calculation in progress and hands
+    the newest board to the worker. poll() returns the latest finished result
+    as (job id, probabilities) once, or None.
+    """
+
+    def __init__(self):
+        self.calculator = ProbabilityCalculator()
+        self._lock = threading.Condition()
+        self._pending = None
+        self._cancel = threading.Event()
+        self._result = None
+        self._job_id = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="ProbabilityWorker",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, view: bytes, width: int, height: int, mines: int,
+               topology: Topology = Topology.SQUARE) -> int:
+        """Queue a board for calculation and return its job id."""
+        with self._lock:
+            self._job_id += 1
+            self._pending = (self._job_id, bytes(view), width, height, mines, topology)
+            self._cancel.set()
+            self._lock.notify()
+            return self._job_id
+
+    def cancel(self):
+        """Drop any queued or running calculation."""
+        with self._lock:
+            self._pending = None
+            self._cancel.set()
+
+    def poll(self) -> Optional[Tuple[int, List[Optional[float]]]]:
+        """Take the latest finished result, if any."""
+        with self._lock:
+            result, self._result = self._result, None
+            return result
+
+    def stop(self):
+        """Stop the worker thread."""
+        with self._lock:
+            self._stopped = True
+            self._pending = None
+            self._cancel.set()
+            self._lock.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._pending is None and not self._stopped:
+                    self._lock.wait()
+                if self._stopped:
+                    return
+                job_id, view, width, height, mines, topology = self._pending
+                self._pending = None
+                self._cancel = cancel = threading.Event()
+            try:
+                probabilities = self.calculator.calculate(view, width, height, mines,
+                                                          cancel, topology)
+            except Cancelled:
+                continue
+            with self._lock:
+                if not cancel.is_set():
+                    self._result = (job_id, probabilities)
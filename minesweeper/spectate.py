@@ -0,0 +1,416 @@
+"""
+Live spectating of Minesweeper games.
+
+A SpectatorBroadcast follows a MinesweeperGame's moves and fans them out to
+any number of subscribers, in-process or over TCP through SpectatorServer.
+Each subscriber first receives a zlib-compressed snapshot of the board and
+then one delta frame per move. Deltas list the changed cells as runs of
+equal cell codes, with varint gaps and lengths. A subscriber that falls
+more than max_backlog frames behind has its backlog dropped and is sent a
+fresh snapshot instead.
+
+Frame layout (all integers are unsigned LEB128 varints):
+    snapshot: 0x01 seq width height mines state zlib(view)
+    delta:    0x02 seq state (gap run_length code)*
+Cell codes are those of MinesweeperGame.get_view().
+"""
+
+import socket
+import socketserver
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from .game import GameState, MinesweeperGame, VIEW_HIDDEN
+
+
+FRAME_SNAPSHOT = 0x01
+FRAME_DELTA = 0x02
+
+_STATES = list(GameState)
+
+
+def _write_varint(out: bytearray, value: int):
+    """Append an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint, returning (value, next position)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_snapshot(seq: int, width: int, height: int, mines: int,
+                    state: GameState, view: bytes) -> bytes:
+    """Encode a full board as a snapshot frame."""
+    out = bytearray([FRAME_SNAPSHOT])
+    for value in (seq, width, height, mines, _STATES.index(state)):
+        _write_varint(out, value)
+    out += zlib.compress(bytes(view), 9)
+    return bytes(out)
+
+
+def encode_delta(seq: int, state: GameState, old: bytes, new: bytes) -> bytes:
+    """Encode the cells that changed between two views as a delta frame."""
+    out = bytearray([FRAME_DELTA])
+    _write_varint(out, seq)
+    _write_varint(out, _STATES.index(state))
+
+    position = 0  # First cell not yet covered by a run
+    i = 0
+    size = len(new)
+    while i < size:
+        if old[i] == new[i]:
+            i += 1
+            continue
+        code = new[i]
+        start = i
+        while i < size and old[i] != new[i] and new[i] == code:
+            i += 1
+        _write_varint(out, start - position)
+        _write_varint(out, i - start)
+        out.append(code)
+        position = i
+    return bytes(out)
+
+
+class SpectatorView:
+    """An observer's copy of the broadcast board, rebuilt from frames."""
+
+    def __init__(self):
+        self.seq = -1
+        self.width = 0
+        self.height = 0
+        self.mines = 0
+        self.game_state = GameState.NOT_STARTED
+        self.view = bytearray()
+
+    def apply(self, frame: bytes) -> bool:
+        """
+        Apply a frame. Returns False for a delta that does not follow the
+        current sequence number; the view is then left untouched until the
+        next snapshot.
+        """
+        kind = frame[0]
+        seq, pos = _read_varint(frame, 1)
+        if kind == FRAME_SNAPSHOT:
+            self.width, pos = _read_varint(frame, pos)
+            self.height, pos = _read_varint(frame, pos)
+            self.mines, pos = _read_varint(frame, pos)
+            state, pos = _read_varint(frame, pos)
+            self.view = bytearray(zlib.decompress(frame[pos:]))
+        elif kind == FRAME_DELTA:
+            if seq != self.seq + 1:
+                return False
+            state, pos = _read_varint(frame, pos)
+            position = 0
+            view = self.view
+            while pos < len(frame):
+                gap, pos = _read_varint(frame, pos)
+                length, pos = _read_varint(frame, pos)
+                start = position + gap
+                view[start:start + length] = bytes([frame[pos]]) * length
+                pos += 1
+                position = start + length
+        else:
+            raise ValueError(f"unknown frame type {kind}")
+        self.seq = seq
+        self.game_state = _STATES[state]
+        return True
+
+    def render(self) -> str:
+        """Draw the board as text."""
+        symbols = "·12345678#F?*"
+        rows = []
+        for row in range(self.height):
+            codes = self.view[row * self.width:(row + 1) * self.width]
+            rows.append(" ".join(symbols[code] for code in codes))
+        return "\n".join(rows)
+
+
+class Subscription:
+    """
+    One observer's queue of frames from a SpectatorBroadcast.
+    Frames are shared bytes objects, so fan-out costs one append per
+    subscriber. If the queue grows past the broadcast's max_backlog it is
+    dropped and the next read starts with a fresh snapshot.
+    """
+
+    def __init__(self, broadcast: "SpectatorBroadcast"):
+        self._broadcast = broadcast
+        self._frames: deque = deque()
+        self._ready = threading.Condition(threading.Lock())
+        self.needs_snapshot = True
+        self.closed = False
+        self.snapshots_sent = 0
+        self.bytes_sent = 0
+
+    def _push(self, frame: bytes, max_backlog: int):
+        """Queue a frame; called with the broadcast lock held."""
+        with self._ready:
+            if self.needs_snapshot:
+                return  # A snapshot taken at read time will include this move
+            if len(self._frames) >= max_backlog:
+                self._frames.clear()
+                self.needs_snapshot = True
+            else:
+                self._frames.append(frame)
+            self._ready.notify()
+
+    def get(self, timeout: Optional[float] = None) -> List[bytes]:
+        """
+        Take every queued frame, waiting up to `timeout` seconds for one.
+        Returns an empty list on timeout or once the subscription is closed.
+        """
+        with self._ready:
+            if not self._frames and not self.needs_snapshot and not self.closed:
+                self._ready.wait(timeout)
+            if self.closed:
+                return []
+            catch_up = self.needs_snapshot
+        frames = [self._broadcast._catch_up(self)] if catch_up else []
+        with self._ready:
+            frames.extend(self._frames)
+            self._frames.clear()
+        self.bytes_sent += sum(len(frame) for frame in frames)
+        return frames
+
+    def close(self):
+        """Stop receiving frames."""
+        self._broadcast.unsubscribe(self)
+        with self._ready:
+            self.closed = True
+            self._frames.clear()
+            self._ready.notify_all()
+
+
+class SpectatorBroadcast:
+    """Fans a game's moves out to subscribers as snapshot and delta frames."""
+
+    def __init__(self, game: MinesweeperGame, max_backlog: int = 256):
+        self.max_backlog = max_backlog
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscription] = []
+        self._snapshot: Optional[bytes] = None
+        self.game: Optional[MinesweeperGame] = None
+        self.attach(game)
+
+    def attach(self, game: MinesweeperGame):
+        """Follow a different game; every subscriber is sent a fresh snapshot."""
+        if self.game is not None:
+            self.game.remove_move_listener(self._on_move)
+        self.game = game
+        game.add_move_listener(self._on_move)
+        self._publish_snapshot()
+
+    def detach(self):
+        """Stop following the current game."""
+        if self.game is not None:
+            self.game.remove_move_listener(self._on_move)
+
+    def subscribe(self) -> Subscription:
+        """Add an observer. Its first frame will be a snapshot."""
+        subscription = Subscription(self)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove an observer."""
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _publish_snapshot(self):
+        """Start a new board: every subscriber restarts from a snapshot."""
+        with self._lock:
+            self.seq += 1
+            self._view = bytes(self.game.get_view())
+            self._state = self.game.game_state
+            self._snapshot = None
+            for subscription in self._subscribers:
+                with subscription._ready:
+                    subscription._frames.clear()
+                    subscription.needs_snapshot = True
+                    subscription._ready.notify()
+
+    def _on_move(self, game: MinesweeperGame, move: str, row: int, col: int):
+        """Turn an applied move into a delta frame for every subscriber."""
+        if move == "reset" or len(self._view) != game.width * game.height:
+            self._publish_snapshot()
+            return
+
+        view = bytes(game.get_view())
+        if view == self._view and game.game_state == self._state:
+            return
+        with self._lock:
+            self.seq += 1
+            frame = encode_delta(self.seq, game.game_state, self._view, view)
+            self._view = view
+            self._state = game.game_state
+            self._snapshot = None
+            for subscription in self._subscribers:
+                subscription._push(frame, self.max_backlog)
+
+    def _catch_up(self, subscription: Subscription) -> bytes:
+        """Hand a lagging or new subscriber the current snapshot."""
+        with self._lock:
+            if self._snapshot is None:
+                game = self.game
+                self._snapshot = encode_snapshot(self.seq, game.width, game.height,
+                                                 game.mine_count, self._state, self._view)
+            with subscription._ready:
+                subscription.needs_snapshot = False
+                subscription._frames.clear()
+            subscription.snapshots_sent += 1
+            return self._snapshot
+
+
+class _SpectatorHandler(socketserver.BaseRequestHandler):
+    """Streams one subscription to a TCP client as varint length-prefixed frames."""
+
+    def handle(self):
+        subscription = self.server.broadcast.subscribe()
+        try:
+            while not self.server.stopping:
+                frames = subscription.get(timeout=0.5)
+                if not frames:
+                    continue
+                out = bytearray()
+                for frame in frames:
+                    _write_varint(out, len(frame))
+                    out += frame
+                self.request.sendall(out)
+        except OSError:
+            pass  # Client went away
+        finally:
+            subscription.close()
+
+
+class SpectatorServer(socketserver.ThreadingTCPServer):
+    """
+    TCP server for spectators in other processes. Each connection gets its
+    own subscription, so a slow client only delays itself and is caught up
+    with a snapshot. There is no authentication: the server listens on the
+    loopback interface unless a host such as "0.0.0.0" is passed to let
+    spectators on the local network connect.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, broadcast: SpectatorBroadcast, host: str = "127.0.0.1",
+                 port: int = 0):
+        self.broadcast = broadcast
+        self.stopping = False
+        super().__init__((host, port), _SpectatorHandler)
+
+    def start(self) -> Tuple[str, int]:
+        """Serve in a background thread and return the bound address."""
+        threading.Thread(target=self.serve_forever, name="SpectatorServer",
+                         daemon=True).start()
+        return self.server_address
+
+    def stop(self):
+        """Stop serving and disconnect spectators."""
+        self.stopping = True
+        self.shutdown()
+        self.server_close()
+
+
+def watch(host: str, port: int) -> Iterator[SpectatorView]:
+    """Connect to a SpectatorServer and yield the board after every frame."""
+    spectator = SpectatorView()
+    with socket.create_connection((host, port)) as sock:
+        buffer = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return
+            buffer += chunk
+            pos = 0
+            while pos < len(buffer):
+                try:
+                    length, start = _read_varint(buffer, pos)
+                except IndexError:
+                    break
+                if start + length > len(buffer):
+                    break
+                spectator.apply(buffer[start:start + length])
+                pos = start + length
+                yield spectator
+            buffer = buffer[pos:]
+
+
+def benchmark(subscribers: int = 1000, games: int = 20, width: int = 30,
+              height: int = 16, mines: int = 99, seed: int = 0):
+    """
+    Play random games with many local subscribers attached and report frame
+    sizes and the publish cost per move and per subscriber. Every subscriber
+    view is checked against the game at the end of each game.
+    """
+    import random
+
+    rng = random.Random(seed)
+    game = MinesweeperGame(width, height, mines, seed=seed)
+    broadcast = SpectatorBroadcast(game)
+    subscriptions = [broadcast.subscribe() for _ in range(subscribers)]
+    views = [SpectatorView() for _ in subscriptions]
+
+    moves = 0
+    publish_time = 0.0
+    delta_bytes = 0
+    snapshot_bytes = 0
+    for _ in range(games):
+        while game.game_state not in [GameState.WON, GameState.LOST]:
+            hidden = [i for i, code in enumerate(game.get_view()) if code == VIEW_HIDDEN]
+            row, col = divmod(rng.choice(hidden), width)
+            start = time.perf_counter()
+            if rng.random() < 0.2:
+                game.flag_cell(row, col)
+            else:
+                game.click_cell(row, col)
+            publish_time += time.perf_counter() - start
+            moves += 1
+            for subscription, view in zip(subscriptions, views):
+                for frame in subscription.get(timeout=0):
+                    if frame[0] == FRAME_DELTA:
+                        delta_bytes += len(frame)
+                    view.apply(frame)
+        expected = bytes(game.get_view())
+        if any(bytes(view.view) != expected for view in views):
+            raise AssertionError("a subscriber's view differs from the game")
+        snapshot_bytes += len(encode_snapshot(broadcast.seq, width, height, mines,
+                                              game.game_state, expected))
+        game.reset_game()
+
+    per_delta = delta_bytes / (moves * subscribers)
+    print(f"{subscribers} subscribers, {games} games, {moves} moves")
+    print(f"raw view {width * height} B, final-board snapshot {snapshot_bytes / games:.0f} B, "
+          f"mean delta {per_delta:.1f} B")
+    print(f"move + publish: {publish_time / moves * 1000:.2f} ms per move, "
+          f"{publish_time / moves / subscribers * 1e6:.2f} us per subscriber")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 3:
+        for board in watch(sys.argv[1], int(sys.argv[2])):
+            print(f"\n{board.game_state.value}\n{board.render()}")
+    else:
+        benchmark()
@@ -0,0 +1,549 @@
+"""
+Per-game statistics for Minesweeper.
+
+Every finished game is appended to a JSON-lines log, which is the source of
+truth, and indexed into a SQLite database for queries. Writes are queued and
+committed in batches by a background thread so the GUI never waits on disk.
+The index keeps running per-configuration counters and a time histogram so
+that best times, percentiles, rolling win rates and histograms stay fast
+with millions of games.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .game import BoardConfig, DIFFICULTY_CONFIGS, GameState, MinesweeperGame
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    time REAL NOT NULL,
+    clicks INTEGER,
+    bbbv INTEGER,
+    seed INTEGER,
+    first_click INTEGER,
+    seq INTEGER NOT NULL,
+    cum_wins INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_time
+    ON games (width, height, mines, won, time);
+CREATE UNIQUE INDEX IF NOT EXISTS games_by_seq
+    ON games (width, height, mines, seq, cum_wins);
+CREATE INDEX IF NOT EXISTS games_by_played_at
+    ON games (width, height, mines, played_at, seq);
+CREATE TABLE IF NOT EXISTS config_totals (
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    played INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    PRIMARY KEY (width, height, mines)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS time_histogram (
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (width, height, mines, won, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS imported_best (
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    time REAL NOT NULL,
+    PRIMARY KEY (width, height, mines, time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class GameRecord(NamedTuple):
+    """A single finished game."""
+    width: int
+    height: int
+    mines: int
+    won: bool
+    time: float
+    clicks: Optional[int] = None
+    bbbv: Optional[int] = None
+    seed: Optional[int] = None
+    first_click: Optional[int] = None  # Row-major index; with the seed it regenerates the board
+    played_at: float = 0.0
+    imported: bool = False
+
+    @property
+    def config(self) -> BoardConfig:
+        """The board configuration this game was played on."""
+        return (self.width, self.height, self.mines)
+
+    @classmethod
+    def from_game(cls, game: MinesweeperGame, elapsed: float) -> "GameRecord":
+        """Build a record from a finished game and its elapsed time in seconds."""
+        return cls(
+            width=game.width,
+            height=game.height,
+            mines=game.mine_count,
+            won=game.game_state == GameState.WON,
+            time=float(elapsed),
+            clicks=game.clicks,
+            bbbv=game.calculate_3bv(),
+            seed=game.seed,
+            first_click=game.first_click,
+            played_at=time.time(),
+        )
+
+    def to_json(self) -> str:
+        """Serialize the record as a single log line (without newline)."""
+        return json.dumps(self._asdict(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> "GameRecord":
+        """Parse a record from a log line."""
+        return cls(**json.loads(line))
+
+
+class StatsStore:
+    """
+    Append-only game log with a SQLite index.
+
+    record() only enqueues; a daemon writer thread appends batches to the log
+    and indexes them in one transaction each. Queries read the index through a
+    per-thread connection and see everything written before the last flush().
+    """
+
+    LOG_NAME = "games.log"
+    INDEX_NAME = "games.sqlite"
+
+    def __init__(self, directory: str = "stats", batch_size: int = 500,
+                 flush_interval: float = 1.0):
+        self.directory = directory
+        self.log_path = os.path.join(directory, self.LOG_NAME)
+        self.index_path = os.path.join(directory, self.INDEX_NAME)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        os.makedirs(directory, exist_ok=True)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._dirty = False
+
+        # Create the schema up front so readers never see a missing table
+        conn = self._connect()
+        with conn:
+            conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._writer_loop,
+                                        name="StatsStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the index in WAL mode."""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get this thread's read connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # Writing
+
+    def record(self, record: GameRecord):
+        """Queue a finished game for writing. Never blocks on disk."""
+        if self._closed:
+            raise RuntimeError("StatsStore is closed")
+        self._queue.put(record)
+
+    def record_game(self, game: MinesweeperGame, elapsed: float):
+        """Queue a finished MinesweeperGame for writing."""
+        self.record(GameRecord.from_game(game, elapsed))
+
+    def flush(self):
+        """
+        Block until every record queued so far has been written. Raises
+        RuntimeError if the writer failed since the last flush; the failed
+        records stay in the log when they reached it and are indexed on the
+        next batch or restart.
+        """
+        if self._closed or not self._writer.is_alive():
+            raise RuntimeError("StatsStore is closed")
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError(f"statistics could not be written: {error}") from error
+
+    def close(self):
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+            conn = getattr(self._local, "conn", None)
+            if conn is not None:
+                conn.close()
+                self._local.conn = None
+
+    def _writer_loop(self):
+        """
+        Drain the queue, committing records in batches. A failed batch is
+        kept as the error for flush() to raise and never stops the thread,
+        so waiters are always released.
+        """
+        conn = log = None
+        try:
+            conn = self._connect()
+            self._catch_up(conn)
+            log = open(self.log_path, "a", encoding="utf-8")
+        except Exception as error:
+            self._error = error
+
+        running = True
+        while running:
+            item = self._queue.get()
+            batch: List[GameRecord] = []
+            waiters: List[threading.Event] = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+
+                if not running or waiters or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                if log is None:
+                    self._error = self._error or RuntimeError("statistics log is not open")
+                else:
+                    try:
+                        if self._dirty:
+                            # Index whatever a failed batch left in the log
+                            self._catch_up(conn)
+                            self._dirty = False
+                        self._write_batch(conn, log, batch)
+                    except Exception as error:
+                        self._error = error
+                        self._dirty = True
+            for waiter in waiters:
+                waiter.set()
+
+        if log is not None:
+            log.close()
+        if conn is not None:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, log, batch: List[GameRecord]):
+        """Append a batch to the log, then index it in one transaction."""
+        log.write("".join(record.to_json() + "\n" for record in batch))
+        log.flush()
+        os.fsync(log.fileno())
+        self._index(conn, batch, log.tell())
+
+    def _catch_up(self, conn: sqlite3.Connection):
+        """Index any complete log lines that never made it into SQLite."""
+        if not os.path.exists(self.log_path):
+            return
+        row = conn.execute("SELECT value FROM meta WHERE key = 'log_offset'").fetchone()
+        offset = row[0] if row else 0
+
+        with open(self.log_path, "rb") as log:
+            log.seek(offset)
+            batch: List[GameRecord] = []
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break  # Torn final write; it will be overwritten
+                offset += len(line)
+                try:
+                    batch.append(GameRecord.from_json(line.decode("utf-8")))
+                except (ValueError, TypeError):
+                    pass  # Skip corrupt lines rather than refusing to start
+                if len(batch) >= self.batch_size:
+                    self._index(conn, batch, offset)
+                    batch = []
+            self._index(conn, batch, offset)
+
+        # Drop a torn tail so new records start on a fresh line
+        if os.path.getsize(self.log_path) != offset:
+            with open(self.log_path, "r+b") as log:
+                log.truncate(offset)
+
+    def _index(self, conn: sqlite3.Connection, batch: List[GameRecord], log_offset: int):
+        """
+        Insert records and update the running aggregates in one transaction.
+        Imported best times only go to imported_best; they were never played
+        here, so they stay out of the totals, sequence and histogram.
+        """
+        totals: Dict[BoardConfig, List[int]] = {}
+        histogram: Dict[tuple, int] = {}
+        rows = []
+        imported = []
+
+        with conn:
+            for record in batch:
+                config = record.config
+                if record.imported:
+                    imported.append(config + (record.time,))
+                    continue
+                if config not in totals:
+                    row = conn.execute(
+                        "SELECT played, won FROM config_totals "
+                        "WHERE width = ? AND height = ? AND mines = ?", config
+                    ).fetchone()
+                    totals[config] = list(row) if row else [0, 0]
+                counts = totals[config]
+                counts[0] += 1
+                counts[1] += int(record.won)
+
+                key = config + (int(record.won), int(record.time))
+                histogram[key] = histogram.get(key, 0) + 1
+                rows.append((
+                    record.played_at, record.width, record.height, record.mines,
+                    int(record.won), record.time, record.clicks, record.bbbv,
+                    record.seed, record.first_click, counts[0], counts[1],
+                ))
+
+            conn.executemany(
+                "INSERT INTO games (played_at, width, height, mines, won, time, "
+                "clicks, bbbv, seed, first_click, seq, cum_wins) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            conn.executemany("INSERT OR IGNORE INTO imported_best VALUES (?, ?, ?, ?)",
+                             imported)
+            conn.executemany(
+                "INSERT OR REPLACE INTO config_totals VALUES (?, ?, ?, ?, ?)",
+                [config + tuple(counts) for config, counts in totals.items()]
+            )
+            conn.executemany(
+                "INSERT INTO time_histogram VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (width, height, mines, won, bucket) "
+                "DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in histogram.items()]
+            )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('log_offset', ?)",
+                         (log_offset,))
+
+    # Importing
+
+    def import_settings(self, settings_file: str = "settings.json") -> int:
+        """
+        Import the per-difficulty best times from a settings.json file.
+        They are logged as imported records and only count towards
+        best_times(); times that were already imported are skipped.
+        Returns the number imported.
+        """
+        try:
+            with open(settings_file, "r") as f:
+                high_scores = json.load(f).get("high_scores") or {}
+        except (json.JSONDecodeError, IOError):
+            return 0
+
+        self.flush()
+        conn = self._reader()
+        imported = 0
+        for name, best in high_scores.items():
+            preset = DIFFICULTY_CONFIGS.get(name)
+            if preset is None or best is None:
+                continue
+            config = (preset["width"], preset["height"], preset["mines"])
+            exists = conn.execute(
+                "SELECT 1 FROM imported_best WHERE width = ? AND height = ? "
+                "AND mines = ? AND time = ?", config + (float(best),)
+            ).fetchone()
+            if exists:
+                continue
+            self.record(GameRecord(*config, won=True, time=float(best),
+                                   played_at=time.time(), imported=True))
+            imported += 1
+
+        self.flush()
+        return imported
+
+    # Queries
+
+    def configs(self) -> List[BoardConfig]:
+        """All board configurations that have at least one recorded game."""
+        rows = self._reader().execute(
+            "SELECT width, height, mines FROM config_totals ORDER BY width, height, mines"
+        )
+        return [tuple(row) for row in rows]
+
+    def summary(self, config: BoardConfig) -> Dict[str, float]:
+        """Games played, games won and overall win rate for a configuration."""
+        row = self._reader().execute(
+            "SELECT played, won FROM config_totals "
+            "WHERE width = ? AND height = ? AND mines = ?", config
+        ).fetchone()
+        played, won = row if row else (0, 0)
+        return {"played": played, "won": won,
+                "win_rate": won / played if played else 0.0}
+
+    def best_times(self, config: BoardConfig, limit: int = 10) -> List[float]:
+        """
+        The fastest winning times for a configuration, best first, including
+        best times imported from settings.json.
+        """
+        rows = self._reader().execute(
+            "SELECT time FROM (SELECT time FROM games WHERE width = ? AND height = ? "
+            "AND mines = ? AND won = 1 ORDER BY time LIMIT ?) "
+            "UNION ALL SELECT time FROM imported_best WHERE width = ? AND height = ? "
+            "AND mines = ? ORDER BY time LIMIT ?",
+            config + (limit,) + config + (limit,)
+        )
+        return [row[0] for row in rows]
+
+    def percentile(self, config: BoardConfig, percent: float,
+                   won: bool = True) -> Optional[float]:
+        """
+        The nearest-rank percentile (0-100) of game times for a configuration.
+        The histogram narrows the search to a one-second bucket, so only that
+        bucket's slice of the time index is scanned.
+        """
+        conn = self._reader()
+        buckets = conn.execute(
+            "SELECT bucket, count FROM time_histogram WHERE width = ? AND height = ? "
+            "AND mines = ? AND won = ? ORDER BY bucket", config + (int(won),)
+        ).fetchall()
+        total = sum(count for _, count in buckets)
+        if total == 0:
+            return None
+
+        rank = min(total - 1, max(0, int(round(percent / 100.0 * (total - 1)))))
+        for bucket, count in buckets:
+            if rank < count:
+                break
+            rank -= count
+        row = conn.execute(
+            "SELECT time FROM games WHERE width = ? AND height = ? AND mines = ? "
+            "AND won = ? AND time >= ? AND time < ? ORDER BY time LIMIT 1 OFFSET ?",
+            config + (int(won), bucket, bucket + 1, rank)
+        ).fetchone()
+        return row[0] if row else None
+
+    def win_rate(self, config: BoardConfig, last_games: Optional[int] = None,
+                 since: Optional[float] = None) -> Optional[float]:
+        """
+        Win rate over a rolling window: the most recent `last_games` games,
+        or the games played at or after the `since` timestamp. Uses the
+        cumulative win counter, so any window costs two index lookups.
+        """
+        conn = self._reader()
+        end = conn.execute(
+            "SELECT seq, cum_wins FROM games WHERE width = ? AND height = ? "
+            "AND mines = ? ORDER BY seq DESC LIMIT 1", config
+        ).fetchone()
+        if end is None:
+            return None
+        end_seq, end_wins = end
+
+        if since is not None:
+            first = conn.execute(
+                "SELECT seq FROM games WHERE width = ? AND height = ? AND mines = ? "
+                "AND played_at >= ? ORDER BY played_at LIMIT 1", config + (since,)
+            ).fetchone()
+            if first is None:
+                return None
+            start_seq = first[0] - 1
+        elif last_games is not None:
+            start_seq = max(0, end_seq - last_games)
+        else:
+            start_seq = 0
+
+        start_wins = 0
+        if start_seq > 0:
+            start_wins = conn.execute(
+                "SELECT cum_wins FROM games WHERE width = ? AND height = ? "
+                "AND mines = ? AND seq = ?", config + (start_seq,)
+            ).fetchone()[0]
+        played = end_seq - start_seq
+        return (end_wins - start_wins) / played if played else None
+
+    def histogram(self, config: BoardConfig, bucket_size: int = 1,
+                  won: bool = True) -> List[Tuple[int, int]]:
+        """Game time histogram as (bucket start in seconds, count) pairs."""
+        rows = self._reader().execute(
+            "SELECT bucket / ? * ?, SUM(count) FROM time_histogram "
+            "WHERE width = ? AND height = ? AND mines = ? AND won = ? "
+            "GROUP BY 1 ORDER BY 1",
+            (bucket_size, bucket_size) + config + (int(won),)
+        )
+        return [tuple(row) for row in rows]
+
+
+def benchmark(games: int = 1_000_000, directory: str = "stats_benchmark"):
+    """Fill a store with synthetic games and time each query type."""
+    import random
+    import shutil
+
+    shutil.rmtree(directory, ignore_errors=True)
+    store = StatsStore(directory, batch_size=10_000)
+    rng = random.Random(0)
+    configs = [(p["width"], p["height"], p["mines"]) for p in DIFFICULTY_CONFIGS.values()]
+
+    start = time.perf_counter()
+    now = time.time() - games
+    for i in range(games):
+        width, height, mines = rng.choice(configs)
+        store.record(GameRecord(width, height, mines, won=rng.random() < 0.4,
+                                time=rng.uniform(1, 600), clicks=rng.randint(1, 400),
+                                bbbv=rng.randint(1, 300), seed=i, played_at=now + i))
+    store.flush()
+    print(f"record+flush: {games / (time.perf_counter() - start):,.0f} games/s")
+
+    config = configs[-1]
+    queries = [
+        ("best_times", lambda: store.best_times(config)),
+        ("median", lambda: store.percentile(config, 50)),
+        ("p90", lambda: store.percentile(config, 90)),
+        ("win_rate last 100k", lambda: store.win_rate(config, last_games=100_000)),
+        ("win_rate since", lambda: store.win_rate(config, since=now + games / 2)),
+        ("histogram 10s", lambda: store.histogram(config, bucket_size=10)),
+    ]
+    for name, query in queries:
+        start = time.perf_counter()
+        for _ in range(20):
+            query()
+        print(f"{name}: {(time.perf_counter() - start) / 20 * 1000:.2f} ms")
+
+    store.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark()
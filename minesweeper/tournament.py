@@ -0,0 +1,424 @@
+"""
+Solver tournaments and difficulty calibration.
+
+Runs every strategy over the same seeded boards for every board
+configuration in a process pool. Each chunk of games is reduced to running
+sums before it leaves the worker and is appended to a JSON-lines
+checkpoint, so memory does not grow with the number of games and an
+interrupted run resumes where it stopped. The report gives win rate,
+guesses per game and decision time with 95% confidence intervals.
+
+Strategies are built-in names from STRATEGIES or "module:attr" specs naming
+an importable factory. A factory takes a random.Random and returns an
+object with choose(view, game) -> (cells to reveal, whether it guessed).
+Workers import specs themselves, so strategies need not exist in the
+parent process's memory, which spawned workers cannot see.
+
+Usage:
+    python -m minesweeper.tournament --games 1000 --configs beginner,intermediate
+    python -m minesweeper.tournament --strategies probability,mybots:GreedyBot
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .game import (BoardConfig, DIFFICULTY_CONFIGS, GameState, MinesweeperGame,
+                   VIEW_HIDDEN, get_neighbor_table)
+from .solver import ProbabilityCalculator
+
+
+class SinglePointStrategy:
+    """
+    Deduces from one number at a time: a number whose known mines are all
+    found clears its other neighbours, and one whose unknown neighbours must
+    all be mines marks them. Guesses uniformly at random when stuck.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.mines = set()
+
+    def choose(self, view: bytes, game: MinesweeperGame) -> Tuple[List[int], bool]:
+        """Return (cells to reveal, whether this was a guess)."""
+        neighbors = get_neighbor_table(game.width, game.height, game.topology).indices
+        safe = set()
+        changed = True
+        while changed:
+            changed = False
+            for index, code in enumerate(view):
+                if code > 8:
+                    continue
+                hidden = [n for n in neighbors[index] if view[n] == VIEW_HIDDEN]
+                unknown = [n for n in hidden if n not in self.mines and n not in safe]
+                if not unknown:
+                    continue
+                known = sum(1 for n in hidden if n in self.mines)
+                if known == code:
+                    safe.update(unknown)
+                    changed = True
+                elif code - known == len(unknown):
+                    self.mines.update(unknown)
+                    changed = True
+
+        if safe:
+            return sorted(safe), False
+        candidates = [i for i, code in enumerate(view)
+                      if code == VIEW_HIDDEN and i not in self.mines]
+        return [self.rng.choice(candidates)], True
+
+
+class ProbabilityStrategy:
+    """
+    Reveals every cell with zero mine probability, otherwise guesses the
+    lowest-probability cell. With prefer_corners, ties go to cells with the
+    fewest neighbours, which are more likely to open new information.
+    """
+
+    def __init__(self, rng: random.Random, prefer_corners: bool = False):
+        self.rng = rng
+        self.prefer_corners = prefer_corners
+        self.calculator = ProbabilityCalculator()
+
+    def choose(self, view: bytes, game: MinesweeperGame) -> Tuple[List[int], bool]:
+        """Return (cells to reveal, whether this was a guess)."""
+        probabilities = self.calculator.calculate(view, game.width, game.height,
+                                                  game.mine_count, topology=game.topology)
+        hidden = [i for i, code in enumerate(view)
+                  if code == VIEW_HIDDEN and probabilities[i] is not None]
+        safe = [i for i in hidden if probabilities[i] == 0]
+        if safe:
+            return safe, False
+
+        best = min(probabilities[i] for i in hidden)
+        candidates = [i for i in hidden if probabilities[i] - best < 1e-9]
+        if self.prefer_corners:
+            neighbors = get_neighbor_table(game.width, game.height, game.topology).indices
+            fewest = min(len(neighbors[i]) for i in candidates)
+            candidates = [i for i in candidates if len(neighbors[i]) == fewest]
+        return [self.rng.choice(candidates)], True
+
+
+# Strategies are looked up by name so work can be sent to worker processes
+STRATEGIES: Dict[str, Callable[[random.Random], object]] = {
+    "single_point": SinglePointStrategy,
+    "probability": ProbabilityStrategy,
+    "probability_corners": lambda rng: ProbabilityStrategy(rng, prefer_corners=True),
+}
+
+
+def resolve_strategy(spec: str) -> Callable[[random.Random], object]:
+    """
+    Look up a built-in strategy name or import a "module:attr" factory,
+    where attr may be dotted. Raises ValueError if it cannot be found.
+    """
+    factory = STRATEGIES.get(spec)
+    if factory is not None:
+        return factory
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"unknown strategy {spec!r}; use a built-in name or module:attr")
+    try:
+        factory = importlib.import_module(module_name)
+        for part in attr.split("."):
+            factory = getattr(factory, part)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"cannot load strategy {spec!r}: {e}")
+    if not callable(factory):
+        raise ValueError(f"strategy {spec!r} is not callable")
+    return factory
+
+
+def parse_config(text: str) -> BoardConfig:
+    """Parse a preset name such as "expert" or a WIDTHxHEIGHTxMINES string."""
+    preset = DIFFICULTY_CONFIGS.get(text.lower())
+    if preset is not None:
+        return (preset["width"], preset["height"], preset["mines"])
+    try:
+        width, height, mines = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"unknown board configuration {text!r}")
+    return (width, height, mines)
+
+
+def play_game(strategy_name: str, config: BoardConfig,
+              seed: int) -> Tuple[bool, int, int, float, float]:
+    """
+    Play one seeded board with a strategy name or spec. Returns (won, guesses, decisions,
+    total decision seconds, sum of squared decision seconds).
+
+    Mine placement avoids the first click, so the opening click is drawn
+    from the seed rather than chosen by the strategy; every strategy then
+    plays the same board. It is not counted as a decision or a guess.
+    """
+    width, height, mines = config
+    game = MinesweeperGame(width, height, mines, seed=seed)
+    rng = random.Random(seed)
+    game.click_cell(*divmod(rng.randrange(width * height), width))
+    strategy = resolve_strategy(strategy_name)(rng)
+    guesses = decisions = 0
+    total = squares = 0.0
+
+    while game.game_state == GameState.PLAYING:
+        start = time.perf_counter()
+        cells, guessed = strategy.choose(bytes(game.get_view()), game)
+        elapsed = time.perf_counter() - start
+        decisions += 1
+        total += elapsed
+        squares += elapsed * elapsed
+        if guessed:
+            guesses += 1
+        for cell in cells:
+            row, col = divmod(cell, width)
+            if not game.click_cell(row, col):
+                break
+    return game.game_state == GameState.WON, guesses, decisions, total, squares
+
+
+def _play_chunk(strategy_name: str, config: BoardConfig, seeds: range) -> dict:
+    """Play a chunk of boards in a worker and reduce it to running sums."""
+    totals = {"strategy": strategy_name, "config": list(config),
+              "seeds": [seeds.start, seeds.stop], "games": 0, "wins": 0,
+              "guesses": 0, "guesses_sq": 0, "decisions": 0,
+              "decision_time": 0.0, "decision_time_sq": 0.0}
+    for seed in seeds:
+        won, guesses, decisions, total, squares = play_game(strategy_name, config, seed)
+        totals["games"] += 1
+        totals["wins"] += int(won)
+        totals["guesses"] += guesses
+        totals["guesses_sq"] += guesses * guesses
+        totals["decisions"] += decisions
+        totals["decision_time"] += total
+        totals["decision_time_sq"] += squares
+    return totals
+
+
+class Aggregate:
+    """Running sums for one strategy on one board configuration."""
+
+    FIELDS = ("games", "wins", "guesses", "guesses_sq", "decisions",
+              "decision_time", "decision_time_sq")
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def add(self, totals: dict):
+        """Fold a chunk's sums into this aggregate."""
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + totals[field])
+
+    def win_rate(self) -> Tuple[float, float, float]:
+        """Win rate with a 95% Wilson score interval."""
+        n = self.games
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        p = self.wins / n
+        z = 1.96
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return p, centre - margin, centre + margin
+
+    @staticmethod
+    def _mean_interval(total: float, squares: float, n: int) -> Tuple[float, float]:
+        """Mean and 95% normal-approximation half width from running sums."""
+        if n == 0:
+            return 0.0, 0.0
+        mean = total / n
+        if n < 2:
+            return mean, float("inf")
+        variance = max(0.0, (squares - n * mean * mean) / (n - 1))
+        return mean, 1.96 * math.sqrt(variance / n)
+
+    def guesses_per_game(self) -> Tuple[float, float]:
+        """Mean guesses per game and its 95% half width."""
+        return self._mean_interval(self.guesses, self.guesses_sq, self.games)
+
+    def decision_ms(self) -> Tuple[float, float]:
+        """Mean milliseconds per decision and its 95% half width."""
+        mean, half = self._mean_interval(self.decision_time, self.decision_time_sq,
+                                         self.decisions)
+        return mean * 1000, half * 1000
+
+
+class Tournament:
+    """
+    Every strategy against every configuration on the same seeded boards.
+    Board i of every configuration uses seed + i for every strategy.
+    """
+
+    def __init__(self, strategies: Sequence[str], configs: Sequence[BoardConfig],
+                 games: int, seed: int = 0, chunk_size: int = 50,
+                 checkpoint: Optional[str] = None, workers: Optional[int] = None):
+        for name in strategies:
+            resolve_strategy(name)
+        if games < 1:
+            raise ValueError("games must be at least 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        for width, height, mines in configs:
+            if width < 1 or height < 1:
+                raise ValueError(f"board {width}x{height} must have a positive size")
+            if not 0 < mines < width * height:
+                raise ValueError(f"board {width}x{height}x{mines}: mines must leave "
+                                 f"at least one safe cell")
+        self.strategies = list(strategies)
+        self.configs = [tuple(config) for config in configs]
+        self.games = games
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.results: Dict[Tuple[str, BoardConfig], Aggregate] = {
+            (name, config): Aggregate() for name in self.strategies for config in self.configs
+        }
+        self._done = set()  # (strategy, config, first seed, end seed)
+        self._load_checkpoint()
+
+    def _chunk_seeds(self) -> List[range]:
+        """The seed ranges each strategy plays on each configuration."""
+        return [range(self.seed + first, self.seed + min(self.games, first + self.chunk_size))
+                for first in range(0, self.games, self.chunk_size)]
+
+    def _load_checkpoint(self):
+        """
+        Fold already finished chunks back in so a run can resume. Chunks
+        from runs with other seeds or chunk sizes are ignored. A torn final
+        line from an interrupted run is dropped so new chunks start on a
+        fresh line; that chunk is played again.
+        """
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return
+        planned = {(seeds.start, seeds.stop) for seeds in self._chunk_seeds()}
+        offset = 0
+        with open(self.checkpoint, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    totals = json.loads(line)
+                    key = (totals["strategy"], tuple(totals["config"]))
+                    done = key + tuple(totals["seeds"])
+                    if not all(field in totals for field in Aggregate.FIELDS):
+                        raise KeyError("missing sums")
+                except (ValueError, TypeError, KeyError):
+                    continue  # Skip corrupt lines rather than refusing to resume
+                if (key in self.results and tuple(totals["seeds"]) in planned and
+                        done not in self._done):
+                    self._done.add(done)
+                    self.results[key].add(totals)
+
+        if os.path.getsize(self.checkpoint) != offset:
+            with open(self.checkpoint, "r+b") as f:
+                f.truncate(offset)
+
+    def _pending_chunks(self) -> Iterator[tuple]:
+        """Chunks not yet in the checkpoint, one configuration at a time."""
+        for config in self.configs:
+            for seeds in self._chunk_seeds():
+                for name in self.strategies:
+                    if (name, config, seeds.start, seeds.stop) not in self._done:
+                        yield name, config, seeds
+
+    def run(self, progress: Optional[Callable[[dict], None]] = None):
+        """
+        Play every pending chunk, checkpointing each as it finishes. Only a
+        bounded number of chunks is in flight at once. progress, if given,
+        is called with each finished chunk's sums.
+        """
+        checkpoint = open(self.checkpoint, "a") if self.checkpoint else None
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                limit = 2 * (self.workers or os.cpu_count() or 1)
+                pending = self._pending_chunks()
+                in_flight = set()
+                while True:
+                    for task in pending:
+                        in_flight.add(pool.submit(_play_chunk, *task))
+                        if len(in_flight) >= limit:
+                            break
+                    if not in_flight:
+                        break
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        totals = future.result()
+                        key = (totals["strategy"], tuple(totals["config"]))
+                        self.results[key].add(totals)
+                        self._done.add(key + tuple(totals["seeds"]))
+                        if checkpoint:
+                            checkpoint.write(json.dumps(totals) + "\n")
+                            checkpoint.flush()
+                        if progress:
+                            progress(totals)
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+    def report(self) -> str:
+        """Format the results as a table, then rank configurations by difficulty."""
+        lines = [f"{'config':<12} {'strategy':<20} {'games':>7} {'win rate (95% CI)':>24} "
+                 f"{'guesses/game':>16} {'ms/decision':>16}"]
+        for config in self.configs:
+            for name in self.strategies:
+                result = self.results[(name, config)]
+                p, low, high = result.win_rate()
+                guesses, guesses_half = result.guesses_per_game()
+                ms, ms_half = result.decision_ms()
+                lines.append(
+                    f"{'x'.join(map(str, config)):<12} {name:<20} {result.games:>7} "
+                    f"{p:>8.1%} [{low:.1%}, {high:.1%}] "
+                    f"{guesses:>8.2f} ±{guesses_half:<6.2f} {ms:>8.2f} ±{ms_half:<6.2f}"
+                )
+
+        # Calibration: the best strategy's win rate orders configurations
+        best = {config: max(self.results[(name, config)].win_rate()[0]
+                            for name in self.strategies)
+                for config in self.configs}
+        lines.append("")
+        lines.append("Difficulty (hardest first, by best win rate):")
+        for config in sorted(self.configs, key=lambda c: best[c]):
+            lines.append(f"  {'x'.join(map(str, config)):<12} {best[config]:.1%}")
+        return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run a Minesweeper solver tournament.")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help="comma separated strategy names or module:attr factories")
+    parser.add_argument("--configs", default="beginner,intermediate,expert",
+                        help="comma separated presets or WIDTHxHEIGHTxMINES")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="boards per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first board")
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None,
+                        help="JSON-lines file to resume from and append to")
+    args = parser.parse_args(argv)
+
+    try:
+        tournament = Tournament(
+            strategies=args.strategies.split(","),
+            configs=[parse_config(text) for text in args.configs.split(",")],
+            games=args.games,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            checkpoint=args.checkpoint,
+            workers=args.workers,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    tournament.run()
+    print(tournament.report())
+
+
+if __name__ == "__main__":
+    main()
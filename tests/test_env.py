@@ -0,0 +1,35 @@
+"""
+Tests that the batched environment plays exactly like MinesweeperGame.
+"""
+
+import pytest
+
+from minesweeper import env
+from minesweeper.env import BatchedMinesweeperEnv, verify_against_game
+from minesweeper.game import Topology
+
+
+@pytest.mark.parametrize("vectorized", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(env.numpy is None,
+                                                reason="numpy is not installed")),
+])
+@pytest.mark.parametrize("topology", list(Topology))
+def test_matches_game(topology, vectorized):
+    assert verify_against_game(num_envs=32, steps=100, topology=topology,
+                               vectorized=vectorized) == 3200
+
+
+@pytest.mark.parametrize("width, height", [(9, 9), (30, 16), (1, 7), (5, 1)])
+def test_mine_placement_matches_game_rng(width, height):
+    # _place_mines reproduces random.randint's draws without calling it
+    assert verify_against_game(num_envs=16, steps=30, width=width, height=height,
+                               mines=max(1, width * height // 6)) == 480
+
+
+def test_invalid_actions_are_rejected():
+    batch = BatchedMinesweeperEnv(2, vectorized=False)
+    with pytest.raises(ValueError):
+        batch.step([0])
+    with pytest.raises(ValueError):
+        batch.step([0, 81])
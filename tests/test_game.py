@@ -0,0 +1,50 @@
+"""
+Regression tests for MinesweeperGame reveal logic.
+"""
+
+from minesweeper.game import MinesweeperGame
+
+
+def _zero_region(game, row, col):
+    """Cells a correct cascade from (row, col) opens: the zero region and its border."""
+    expected = {(row, col)}
+    stack = [(row, col)]
+    while stack:
+        r, c = stack.pop()
+        if game.grid[r][c].adjacent_mines:
+            continue
+        for n in game._get_neighbors(r, c):
+            if n not in expected:
+                expected.add(n)
+                stack.append(n)
+    return expected
+
+
+def _revealed(game):
+    return {(r, c) for r in range(game.height) for c in range(game.width)
+            if game.grid[r][c].is_revealed}
+
+
+def test_first_click_on_zero_cell_opens_its_region():
+    for seed in range(50):
+        game = MinesweeperGame(9, 9, 10, seed=seed)
+        game.click_cell(4, 4)
+        if game.grid[4][4].adjacent_mines == 0:
+            assert _revealed(game) == _zero_region(game, 4, 4)
+            assert len(_revealed(game)) > 1
+            return
+    raise AssertionError("no seed gave a zero first click")
+
+
+def test_later_click_on_zero_cell_opens_its_region():
+    game = MinesweeperGame(16, 16, 20, seed=7)
+    game.click_cell(0, 0)
+    for row in range(game.height):
+        for col in range(game.width):
+            cell = game.grid[row][col]
+            if not cell.is_revealed and not cell.is_mine and cell.adjacent_mines == 0:
+                before = _revealed(game)
+                game.click_cell(row, col)
+                assert _revealed(game) == before | _zero_region(game, row, col)
+                return
+    raise AssertionError("board has no hidden zero cell")
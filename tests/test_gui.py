@@ -0,0 +1,96 @@
+"""
+Tests for the frame-budgeted cascade redraw of the GUI.
+"""
+
+import tkinter as tk
+import types
+
+import pytest
+
+import minesweeper.gui
+from minesweeper.gui import MinesweeperGUI, benchmark_cascade
+
+CONFIGURE_COST = 0.0001  # Seconds to configure one button
+REPAINT_COST = 0.0004    # Seconds for Tk to repaint one configured button
+
+
+class _Root:
+    """Stands in for Tk: queues callbacks and repaints on update_idletasks()."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.callbacks = []
+        self.unpainted = 0
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def update_idletasks(self):
+        self.clock.now += self.unpainted * REPAINT_COST
+        self.unpainted = 0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Simulated time that only the stand-in Tk work advances."""
+    clock = types.SimpleNamespace(now=0.0)
+    clock.perf_counter = lambda: clock.now
+    monkeypatch.setattr(minesweeper.gui, "time", clock)
+    return clock
+
+
+def _app(clock, cells):
+    app = MinesweeperGUI.__new__(MinesweeperGUI)
+    app.root = _Root(clock)
+    app.flush_job = None
+    app.worst_frame_time = 0.0
+    app.cell_draw_cost = 0.0
+    app.pending_cells = {(0, col): 0 for col in range(cells)}
+    app.drawn = []
+
+    def render(row, col):
+        clock.now += CONFIGURE_COST
+        app.drawn.append((row, col))
+        app.root.unpainted += 1
+
+    app._render_cell = render
+    return app
+
+
+def test_chunks_include_the_repaint_in_the_frame_budget(clock):
+    app = _app(clock, 400)
+    frames = []
+    app._flush_pending_cells()
+    while app.root.callbacks:
+        start = clock.now
+        app.root.callbacks.pop(0)()
+        frames.append(clock.now - start)
+
+    assert app.drawn == [(0, col) for col in range(400)]
+    assert not app.pending_cells and app.flush_job is None
+    cell_cost = CONFIGURE_COST + REPAINT_COST
+    assert max(frames) <= MinesweeperGUI.FRAME_BUDGET + 1e-9
+    assert app.worst_frame_time <= MinesweeperGUI.FRAME_BUDGET + 1e-9
+    # Frames are full once the cost per cell is known
+    assert len(frames) <= 400 * cell_cost / MinesweeperGUI.FRAME_BUDGET + 2
+
+
+def _has_display():
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not _has_display(), reason="needs a display, e.g. xvfb-run")
+def test_benchmark_cascade_reveals_the_same_region_both_ways(capsys):
+    results = benchmark_cascade()
+    unchunked, budgeted = results["unchunked"], results["8 ms budget"]
+    assert unchunked["cells_revealed"] == budgeted["cells_revealed"] > 0
+    assert budgeted["updates"] >= unchunked["updates"]
+    assert "worst redraw" in capsys.readouterr().out
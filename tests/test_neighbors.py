@@ -0,0 +1,78 @@
+"""
+Tests for the shared neighbour tables of each board topology.
+"""
+
+import pytest
+
+from minesweeper.game import NeighborTable, Topology, get_neighbor_table
+
+
+def _coords(table, row, col):
+    return set(table.coords[row * table.width + col])
+
+
+def test_square_corner_edge_and_middle():
+    table = get_neighbor_table(4, 3)
+    assert _coords(table, 0, 0) == {(0, 1), (1, 0), (1, 1)}
+    assert _coords(table, 0, 2) == {(0, 1), (0, 3), (1, 1), (1, 2), (1, 3)}
+    assert len(_coords(table, 1, 1)) == 8
+
+
+def test_hex_even_row_leans_left():
+    table = get_neighbor_table(4, 4, Topology.HEX)
+    assert _coords(table, 2, 1) == {(1, 0), (1, 1), (2, 0), (2, 2), (3, 0), (3, 1)}
+
+
+def test_hex_odd_row_leans_right():
+    table = get_neighbor_table(4, 4, Topology.HEX)
+    assert _coords(table, 1, 1) == {(0, 1), (0, 2), (1, 0), (1, 2), (2, 1), (2, 2)}
+
+
+def test_hex_edges_are_clipped():
+    table = get_neighbor_table(4, 4, Topology.HEX)
+    assert _coords(table, 0, 0) == {(0, 1), (1, 0)}
+    assert _coords(table, 1, 3) == {(0, 3), (1, 2), (2, 3)}
+
+
+def test_torus_wraps_around():
+    table = get_neighbor_table(4, 3, Topology.TORUS)
+    assert _coords(table, 0, 0) == {(2, 3), (2, 0), (2, 1), (0, 3), (0, 1),
+                                    (1, 3), (1, 0), (1, 1)}
+    assert all(len(around) == 8 for around in table.indices)
+
+
+@pytest.mark.parametrize("width, height, expected", [
+    (1, 1, [()]),
+    (2, 1, [(1,), (0,)]),
+    (1, 5, [(4, 1), (0, 2), (1, 3), (2, 4), (3, 0)]),
+    (5, 1, [(4, 1), (0, 2), (1, 3), (2, 4), (3, 0)]),
+])
+def test_tiny_tori_have_no_self_or_repeated_neighbours(width, height, expected):
+    table = NeighborTable(width, height, Topology.TORUS)
+    assert [tuple(sorted(a)) for a in table.indices] == [tuple(sorted(e)) for e in expected]
+
+
+def test_two_by_two_torus_sees_every_other_cell_once():
+    table = NeighborTable(2, 2, Topology.TORUS)
+    for cell, around in enumerate(table.indices):
+        assert sorted(around) == [i for i in range(4) if i != cell]
+
+
+@pytest.mark.parametrize("topology", list(Topology))
+@pytest.mark.parametrize("width, height", [(1, 1), (2, 3), (5, 4), (9, 9)])
+def test_neighbours_are_symmetric(topology, width, height):
+    table = NeighborTable(width, height, topology)
+    for cell, around in enumerate(table.indices):
+        assert len(set(around)) == len(around)
+        assert cell not in around
+        for other in around:
+            assert cell in table.indices[other]
+        assert table.coords[cell] == tuple(divmod(n, width) for n in around)
+
+
+def test_tables_are_shared_per_shape():
+    assert get_neighbor_table(9, 9) is get_neighbor_table(9, 9, Topology.SQUARE)
+    assert get_neighbor_table(9, 9, topology=Topology.SQUARE) is get_neighbor_table(9, 9)
+    assert get_neighbor_table(9, 9, Topology.HEX) is get_neighbor_table(9, 9, Topology.HEX)
+    assert get_neighbor_table(9, 9, Topology.HEX) is not get_neighbor_table(9, 9)
+    assert get_neighbor_table(9, 8) is not get_neighbor_table(8, 9)
@@ -0,0 +1,77 @@
+"""
+Tests for the exact mine probability solver against brute-force enumeration.
+"""
+
+import math
+import random
+from itertools import combinations
+
+import pytest
+
+from minesweeper.game import GameState, MinesweeperGame, Topology, get_neighbor_table
+from minesweeper.solver import UNKNOWN_CODES, ProbabilityCalculator
+
+
+def _brute_force(view, width, height, mines, topology):
+    """Mine probability of every unknown cell over all consistent placements."""
+    neighbors = get_neighbor_table(width, height, topology).indices
+    unknown = [i for i, code in enumerate(view) if code in UNKNOWN_CODES]
+    numbers = [(i, code) for i, code in enumerate(view) if code <= 8]
+    counts = dict.fromkeys(unknown, 0)
+    total = 0
+    for placement in combinations(unknown, mines):
+        placed = set(placement)
+        if all(sum(n in placed for n in neighbors[i]) == code for i, code in numbers):
+            total += 1
+            for cell in placement:
+                counts[cell] += 1
+    return {cell: count / total for cell, count in counts.items()}
+
+
+def _boards(topology, count=40, seed=0):
+    """Part-played small boards that are still in progress."""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        width, height = rng.choice([(5, 5), (6, 4)])
+        mines = rng.randint(3, 7)
+        game = MinesweeperGame(width, height, mines, seed=rng.randrange(2 ** 32),
+                               topology=topology)
+        for _ in range(rng.randint(1, 4)):
+            hidden = [i for i, c in enumerate(game.get_view()) if c in UNKNOWN_CODES]
+            game.click_cell(*divmod(rng.choice(hidden), width))
+            if game.game_state != GameState.PLAYING:
+                break
+        if game.game_state != GameState.PLAYING:
+            continue
+        view = bytes(game.get_view())
+        unknown = sum(code in UNKNOWN_CODES for code in view)
+        if math.comb(unknown, mines) <= 50_000:
+            boards.append((view, width, height, mines))
+    return boards
+
+
+@pytest.mark.parametrize("topology", list(Topology))
+def test_probabilities_match_brute_force(topology):
+    calculator = ProbabilityCalculator()
+    for view, width, height, mines in _boards(topology):
+        result = calculator.calculate(view, width, height, mines, topology=topology)
+        expected = _brute_force(view, width, height, mines, topology)
+        for i, code in enumerate(view):
+            if code in UNKNOWN_CODES:
+                assert result[i] == pytest.approx(expected[i], abs=1e-12)
+            else:
+                assert result[i] is None
+
+
+def test_unchanged_frontier_reuses_cached_components():
+    game = MinesweeperGame(16, 16, 40, seed=3)
+    game.click_cell(8, 8)
+    view = bytes(game.get_view())
+    calculator = ProbabilityCalculator()
+
+    first = calculator.calculate(view, 16, 16, 40)
+    assert calculator.last_solved > 0
+    second = calculator.calculate(view, 16, 16, 40)
+    assert calculator.last_solved == 0
+    assert second == first
@@ -0,0 +1,99 @@
+"""
+Tests for spectator frames, backlog handling and the TCP server.
+"""
+
+import queue
+import random
+import threading
+import time
+
+from minesweeper.game import GameState, MinesweeperGame
+from minesweeper.spectate import (FRAME_SNAPSHOT, SpectatorBroadcast, SpectatorServer,
+                                  SpectatorView, encode_delta, encode_snapshot, watch)
+
+
+def test_delta_round_trips_random_views():
+    rng = random.Random(0)
+    for _ in range(500):
+        size = rng.randint(1, 600)
+        old = bytes(rng.randrange(13) for _ in range(size))
+        new = bytearray(old)
+        for _ in range(rng.randint(0, size)):
+            start = rng.randrange(size)
+            new[start:start + rng.randint(1, 20)] = bytes([rng.randrange(13)]) * 20
+        new = bytes(new[:size])
+
+        spectator = SpectatorView()
+        assert spectator.apply(encode_snapshot(7, size, 1, 3, GameState.PLAYING, old))
+        assert spectator.apply(encode_delta(8, GameState.WON, old, new))
+        assert bytes(spectator.view) == new
+        assert spectator.seq == 8
+        assert spectator.game_state == GameState.WON
+
+
+def test_delta_after_a_sequence_gap_is_rejected():
+    old, new = bytes(10), bytes([1]) * 10
+    spectator = SpectatorView()
+    spectator.apply(encode_snapshot(1, 10, 1, 2, GameState.PLAYING, old))
+    assert not spectator.apply(encode_delta(3, GameState.PLAYING, old, new))
+    assert bytes(spectator.view) == old
+    assert spectator.seq == 1
+    assert spectator.apply(encode_delta(2, GameState.PLAYING, old, new))
+    assert bytes(spectator.view) == new
+
+
+def test_lagging_subscriber_gets_one_snapshot_and_no_backlog():
+    game = MinesweeperGame(9, 9, 10, seed=1)
+    game.click_cell(4, 4)
+    broadcast = SpectatorBroadcast(game, max_backlog=4)
+    subscription = broadcast.subscribe()
+    spectator = SpectatorView()
+    for frame in subscription.get(timeout=0):
+        spectator.apply(frame)
+    assert subscription.snapshots_sent == 1
+
+    hidden = [i for i, code in enumerate(game.get_view()) if code > 8]
+    for cell in hidden[:10]:
+        game.flag_cell(*divmod(cell, 9))  # Each flag changes the view
+
+    frames = subscription.get(timeout=0)
+    assert len(frames) == 1 and frames[0][0] == FRAME_SNAPSHOT
+    assert subscription.snapshots_sent == 2
+    spectator.apply(frames[0])
+    assert bytes(spectator.view) == bytes(game.get_view())
+    assert subscription.get(timeout=0) == []
+
+
+def test_server_session_follows_a_reset_to_new_dimensions():
+    game = MinesweeperGame(9, 9, 10, seed=2)
+    broadcast = SpectatorBroadcast(game)
+    server = SpectatorServer(broadcast)
+    host, port = server.start()
+    assert host == "127.0.0.1"
+    boards: "queue.Queue" = queue.Queue()
+
+    def spectate():
+        for board in watch(host, port):
+            boards.put((board.width, board.height, bytes(board.view)))
+
+    threading.Thread(target=spectate, daemon=True).start()
+    try:
+        def wait_for(width, height):
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                try:
+                    board = boards.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if board == (width, height, bytes(game.get_view())):
+                    return
+            raise AssertionError(f"spectator never saw the {width}x{height} board")
+
+        wait_for(9, 9)
+        game.click_cell(4, 4)
+        wait_for(9, 9)
+        game.reset_game(16, 16, 40, seed=3)
+        game.click_cell(8, 8)
+        wait_for(16, 16)
+    finally:
+        server.stop()
@@ -0,0 +1,148 @@
+"""
+Tests for the statistics store, checked against plain-Python references.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from minesweeper.stats import GameRecord, StatsStore
+
+CONFIGS = [(9, 9, 10), (16, 16, 40)]
+
+
+def _records(count=3000, seed=0):
+    rng = random.Random(seed)
+    return [GameRecord(*rng.choice(CONFIGS), won=rng.random() < 0.4,
+                       time=round(rng.uniform(1, 300), 3), seed=i,
+                       played_at=1000.0 + i)
+            for i in range(count)]
+
+
+def _nearest_rank(times, percent):
+    times = sorted(times)
+    rank = min(len(times) - 1, max(0, int(round(percent / 100.0 * (len(times) - 1)))))
+    return times[rank]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StatsStore(str(tmp_path / "stats"), batch_size=256)
+    yield store
+    store.close()
+
+
+def test_queries_match_reference(store):
+    records = _records()
+    for record in records:
+        store.record(record)
+    store.flush()
+
+    for config in CONFIGS:
+        games = [r for r in records if r.config == config]
+        won = [r.time for r in games if r.won]
+        lost = [r.time for r in games if not r.won]
+
+        assert store.summary(config) == {"played": len(games), "won": len(won),
+                                         "win_rate": len(won) / len(games)}
+        assert store.best_times(config, limit=10) == sorted(won)[:10]
+        for percent in [0, 10, 50, 90, 100]:
+            assert store.percentile(config, percent) == _nearest_rank(won, percent)
+            assert store.percentile(config, percent, won=False) == _nearest_rank(lost, percent)
+        for last in [1, 50, 500, len(games), len(games) + 10]:
+            window = games[-last:]
+            assert store.win_rate(config, last_games=last) == pytest.approx(
+                sum(r.won for r in window) / len(window))
+        for since in [1000.0, 1500.5, 2999.0]:
+            window = [r for r in games if r.played_at >= since]
+            assert store.win_rate(config, since=since) == pytest.approx(
+                sum(r.won for r in window) / len(window))
+        assert store.win_rate(config, since=1e9) is None
+
+
+def test_import_settings_is_idempotent_and_not_a_game(store, tmp_path):
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps({"high_scores": {"beginner": 7, "expert": None}}))
+    store.record(GameRecord(9, 9, 10, won=True, time=20.0, played_at=1.0))
+    store.record(GameRecord(9, 9, 10, won=False, time=3.0, played_at=2.0))
+
+    assert store.import_settings(str(settings)) == 1
+    assert store.import_settings(str(settings)) == 0
+    assert store.summary((9, 9, 10)) == {"played": 2, "won": 1, "win_rate": 0.5}
+    assert store.win_rate((9, 9, 10), last_games=2) == 0.5
+    assert store.histogram((9, 9, 10)) == [(20, 1)]
+    assert store.best_times((9, 9, 10)) == [7.0, 20.0]
+
+
+def test_torn_log_tail_is_truncated_and_index_rebuilds(tmp_path):
+    directory = str(tmp_path / "stats")
+    records = _records(500)
+    store = StatsStore(directory)
+    for record in records:
+        store.record(record)
+    store.close()
+
+    log_path = os.path.join(directory, StatsStore.LOG_NAME)
+    size = os.path.getsize(log_path)
+    with open(log_path, "a") as log:
+        log.write('{"width": 9, "hei')
+
+    store = StatsStore(directory)
+    store.flush()
+    assert os.path.getsize(log_path) == size
+    expected = {config: (store.summary(config), store.best_times(config),
+                         store.win_rate(config, last_games=100))
+                for config in CONFIGS}
+    store.close()
+
+    os.remove(os.path.join(directory, StatsStore.INDEX_NAME))
+    store = StatsStore(directory)
+    store.flush()
+    try:
+        for config in CONFIGS:
+            games = [r for r in records if r.config == config]
+            assert store.summary(config)["played"] == len(games)
+            assert (store.summary(config), store.best_times(config),
+                    store.win_rate(config, last_games=100)) == expected[config]
+    finally:
+        store.close()
+
+
+def test_first_click_regenerates_the_board(store):
+    from minesweeper.game import MinesweeperGame
+
+    game = MinesweeperGame(16, 16, 40)
+    game.click_cell(3, 5)
+    record = GameRecord.from_game(game, 1.0)
+    assert GameRecord.from_json(record.to_json()) == record
+
+    replay = MinesweeperGame(16, 16, 40, seed=record.seed)
+    replay.click_cell(*divmod(record.first_click, record.width))
+    assert [c.is_mine for c in replay.cells] == [c.is_mine for c in game.cells]
+
+
+def test_flush_after_close_raises(tmp_path):
+    store = StatsStore(str(tmp_path / "stats"))
+    store.close()
+    with pytest.raises(RuntimeError):
+        store.flush()
+
+
+def test_failed_batch_is_reported_and_recovered(store):
+    index = store._index
+    failures = [OSError("disk full")]
+
+    def flaky(*args):
+        if failures:
+            raise failures.pop()
+        return index(*args)
+
+    store._index = flaky
+    store.record(GameRecord(9, 9, 10, won=True, time=12.0))
+    with pytest.raises(RuntimeError):
+        store.flush()
+    store.record(GameRecord(9, 9, 10, won=False, time=3.0))
+    store.flush()
+    assert store.summary((9, 9, 10))["played"] == 2
@@ -0,0 +1,87 @@
+"""
+Tests for tournament configuration checks and checkpoint resumption.
+"""
+
+import pytest
+
+from minesweeper.tournament import SinglePointStrategy, Tournament, resolve_strategy
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"configs": [(3, 3, 9)]},
+    {"configs": [(9, 9, 0)]},
+    {"configs": [(0, 9, 1)]},
+    {"games": 0},
+    {"chunk_size": 0},
+])
+def test_invalid_settings_are_rejected(kwargs):
+    settings = {"strategies": ["single_point"], "configs": [(9, 9, 10)], "games": 2}
+    settings.update(kwargs)
+    with pytest.raises(ValueError):
+        Tournament(**settings)
+
+
+def test_corrupt_checkpoint_lines_are_skipped(tmp_path):
+    checkpoint = tmp_path / "run.jsonl"
+    checkpoint.write_text(
+        '{"strategy": "single_point"}\n'
+        '[1, 2]\n'
+        '{"strategy": "single_point", "config": [9, 9, 10], "seeds": [0, 2]}\n'
+        'not json\n'
+    )
+    tournament = Tournament(["single_point"], [(9, 9, 10)], games=4, chunk_size=2,
+                            checkpoint=str(checkpoint), workers=1)
+    tournament.run()
+    assert tournament.results[("single_point", (9, 9, 10))].games == 4
+
+
+def test_strategy_specs_are_resolved():
+    assert resolve_strategy("single_point") is SinglePointStrategy
+    assert resolve_strategy("minesweeper.tournament:SinglePointStrategy") is SinglePointStrategy
+    for spec in ["nope", "minesweeper.tournament:", "minesweeper.tournament:Missing",
+                 "no_such_module:x", "minesweeper.game:VIEW_HIDDEN"]:
+        with pytest.raises(ValueError):
+            resolve_strategy(spec)
+    with pytest.raises(ValueError):
+        Tournament(["minesweeper.tournament:Missing"], [(9, 9, 10)], games=2)
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def _sums(tournament):
+    # Decision times vary between runs; everything else is determined by the seeds
+    fields = ("games", "wins", "guesses", "guesses_sq", "decisions")
+    return {key: tuple(getattr(result, field) for field in fields)
+            for key, result in tournament.results.items()}
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path):
+    strategies = ["single_point", "minesweeper.tournament:ProbabilityStrategy"]
+    settings = {"strategies": strategies, "configs": [(9, 9, 10), (8, 8, 12)],
+                "games": 60, "chunk_size": 10, "workers": 2}
+
+    full = Tournament(**settings)
+    full.run()
+
+    checkpoint = str(tmp_path / "run.jsonl")
+    finished = []
+
+    def stop_early(totals):
+        finished.append(totals)
+        if len(finished) == 5:
+            raise _Interrupted()
+
+    with pytest.raises(_Interrupted):
+        Tournament(checkpoint=checkpoint, **settings).run(stop_early)
+    with open(checkpoint, "a") as f:
+        f.write('{"strategy": "single_point", "con')  # Torn write
+
+    resumed = Tournament(checkpoint=checkpoint, **settings)
+    assert 5 <= len(resumed._done) < 24
+    resumed.run()
+    assert _sums(resumed) == _sums(full)
+
+    with open(checkpoint) as f:
+        assert sum(1 for _ in f) == 24